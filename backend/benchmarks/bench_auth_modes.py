@@ -0,0 +1,49 @@
+"""Compare request throughput of Basic credentials and signed session tokens.
+
+Every mode calls GET /api/auth/profile through the test client:
+
+  * Basic, with the verified-credential cache cleared before each request
+  * Basic, with the verified-credential cache warm
+  * Bearer token from POST /api/auth/login with issue_token, user cache warm
+
+Usage: python benchmarks/bench_auth_modes.py [requests]
+"""
+import sys
+import time
+from common import make_app, basic_auth_headers, report, USERNAME, PASSWORD
+from src.utils.auth import credential_cache
+
+def run(client, headers, requests, clear_cache=False):
+    start = time.perf_counter()
+    
+    for _ in range(requests):
+        if clear_cache:
+            credential_cache.clear()
+        response = client.get('/api/auth/profile', headers=headers)
+        assert response.status_code == 200, response.get_json()
+    
+    return time.perf_counter() - start
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    app = make_app()
+    client = app.test_client()
+    
+    response = client.post('/api/auth/login', json={
+        'username': USERNAME,
+        'password': PASSWORD,
+        'issue_token': True
+    })
+    token_headers = {'Authorization': f'Bearer {response.get_json()["token"]}'}
+    basic_headers = basic_auth_headers()
+    
+    # Warm up both paths
+    run(client, basic_headers, 10)
+    run(client, token_headers, 10)
+    
+    report('Basic, no credential cache', requests, run(client, basic_headers, requests, clear_cache=True))
+    report('Basic, credential cache', requests, run(client, basic_headers, requests))
+    report('Bearer session token', requests, run(client, token_headers, requests))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Measure the per-request cost of basic_auth_required with and without the
+verified-credential cache.
+
+The app's User compares plain passwords, so the run is repeated with
+check_password swapped for a PBKDF2-SHA256 verification (100k iterations),
+standing in for a salted hash such as bcrypt.
+
+Usage: python benchmarks/bench_basic_auth.py [requests]
+"""
+import sys
+import time
+import hashlib
+from common import make_app, basic_auth_headers, report, PASSWORD
+from src.models.user_simple import db, User
+from src.utils.auth import basic_auth_required, credential_cache
+
+PBKDF2_SALT = b'benchmark-salt'
+PBKDF2_ITERATIONS = 100000
+PBKDF2_HASH = hashlib.pbkdf2_hmac('sha256', PASSWORD.encode('utf-8'), PBKDF2_SALT, PBKDF2_ITERATIONS)
+
+@basic_auth_required
+def protected(user):
+    return user.id
+
+def pbkdf2_check_password(self, password):
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), PBKDF2_SALT, PBKDF2_ITERATIONS) == PBKDF2_HASH
+
+def run(app, requests, cached):
+    headers = basic_auth_headers()
+    
+    with app.test_request_context(headers=headers):
+        credential_cache.clear()
+        protected()
+        
+        start = time.perf_counter()
+        for _ in range(requests):
+            # Each request gets a fresh session, as it would under Flask
+            db.session.remove()
+            if not cached:
+                credential_cache.clear()
+            protected()
+        return time.perf_counter() - start
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    app = make_app()
+    
+    for label, check_password in (('plain', User.check_password), ('pbkdf2', pbkdf2_check_password)):
+        User.check_password = check_password
+        count = requests if label == 'plain' else max(requests // 50, 20)
+        uncached = run(app, count, cached=False)
+        cached = run(app, count, cached=True)
+        report(f'{label} password, no cache (before)', count, uncached)
+        report(f'{label} password, cached (after)', count, cached)
+        print(f'{"":<40} {uncached / count * 1e6:8.1f} us -> {cached / count * 1e6:.1f} us per request')
+
+if __name__ == '__main__':
+    main()
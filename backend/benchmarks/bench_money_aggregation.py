@@ -0,0 +1,115 @@
+"""Compare summary aggregation over FLOAT reais against INTEGER cents.
+
+Builds a synthetic transactions table twice in a throwaway SQLite file, once
+with money as FLOAT (the old schema) and once as INTEGER cents, and times:
+
+  * the old Python path: fetch every row and sum float(...) per row
+  * SUM() in SQLite over the FLOAT columns
+  * SUM() in SQLite over the INTEGER cents columns
+  * the same two SUM()s without GROUP BY, to isolate the arithmetic
+
+Usage: python benchmarks/bench_money_aggregation.py [rows]
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from common import report
+
+SUMMARY_SQL = (
+    'SELECT type, category, payment_method, COUNT(*), SUM(net_amount), SUM(card_fee) '
+    'FROM {table} WHERE user_id = 1 GROUP BY type, category, payment_method'
+)
+
+def create_tables(connection, rows):
+    random.seed(42)
+    for table, money_type in (('transactions_float', 'FLOAT'), ('transactions_cents', 'INTEGER')):
+        connection.execute(
+            f'CREATE TABLE {table} (id INTEGER PRIMARY KEY, user_id INTEGER, type TEXT, '
+            f'category TEXT, payment_method TEXT, amount {money_type}, card_fee {money_type}, '
+            f'net_amount {money_type}, date TEXT)'
+        )
+    
+    float_rows = []
+    cents_rows = []
+    for i in range(rows):
+        amount_cents = random.randint(100, 50000)
+        fee_cents = (amount_cents * 350 + 5000) // 10000 if i % 2 else 0
+        row = (
+            1,
+            'income' if i % 3 else 'expense',
+            random.choice(('Vendas', 'Aluguel', 'Fornecedores', 'Servicos')),
+            random.choice(('pix', 'credito', 'debito', 'dinheiro')),
+        )
+        day = f'2025-{i % 12 + 1:02d}-{i % 28 + 1:02d} 10:00:00.000000'
+        float_rows.append(row + (amount_cents / 100, fee_cents / 100, (amount_cents - fee_cents) / 100, day))
+        cents_rows.append(row + (amount_cents, fee_cents, amount_cents - fee_cents, day))
+    
+    columns = 'user_id, type, category, payment_method, amount, card_fee, net_amount, date'
+    connection.executemany(f'INSERT INTO transactions_float ({columns}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', float_rows)
+    connection.executemany(f'INSERT INTO transactions_cents ({columns}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', cents_rows)
+    connection.commit()
+
+def python_float_sum(connection):
+    groups = {}
+    for t_type, category, method, net_amount, card_fee in connection.execute(
+        'SELECT type, category, payment_method, net_amount, card_fee FROM transactions_float WHERE user_id = 1'
+    ):
+        group = groups.setdefault((t_type, category, method), [0, 0, 0])
+        group[0] += 1
+        group[1] += float(net_amount)
+        group[2] += float(card_fee)
+    return totals_by_type((key, net_amount) for key, (_, net_amount, _) in groups.items())
+
+def sql_sum(connection, table):
+    return totals_by_type(
+        ((t_type, category, method), net_amount)
+        for t_type, category, method, _, net_amount, _ in connection.execute(SUMMARY_SQL.format(table=table))
+    )
+
+def sql_plain_sum(connection, table):
+    return connection.execute(
+        f'SELECT SUM(amount), SUM(card_fee), SUM(net_amount) FROM {table} WHERE user_id = 1'
+    ).fetchone()
+
+def totals_by_type(groups):
+    totals = {}
+    for (t_type, _, _), net_amount in groups:
+        totals[t_type] = totals.get(t_type, 0) + net_amount
+    return totals
+
+def timed(function, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    connection = sqlite3.connect(os.path.join(tempfile.mkdtemp(), 'money.db'))
+    create_tables(connection, rows)
+    
+    python_totals, python_seconds = timed(python_float_sum, connection)
+    float_totals, float_seconds = timed(sql_sum, connection, 'transactions_float')
+    cents_totals, cents_seconds = timed(sql_sum, connection, 'transactions_cents')
+    _, float_plain_seconds = timed(sql_plain_sum, connection, 'transactions_float')
+    _, cents_plain_seconds = timed(sql_plain_sum, connection, 'transactions_cents')
+    
+    report('python loop over FLOAT rows (before)', rows, python_seconds)
+    report('SQL SUM over FLOAT', rows, float_seconds)
+    report('SQL SUM over INTEGER cents (after)', rows, cents_seconds)
+    report('ungrouped SQL SUM over FLOAT', rows, float_plain_seconds)
+    report('ungrouped SQL SUM over INTEGER cents', rows, cents_plain_seconds)
+    
+    print()
+    for t_type in sorted(cents_totals):
+        print(f'{t_type:<8} cents exact: {cents_totals[t_type] / 100:.2f}  '
+              f'float sql: {float_totals[t_type]!r}  float python: {python_totals[t_type]!r}')
+
+if __name__ == '__main__':
+    main()
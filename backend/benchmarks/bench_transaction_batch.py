@@ -0,0 +1,63 @@
+"""Compare one request per operation against POST /api/transactions/batch.
+
+Usage: python benchmarks/bench_transaction_batch.py [operations] [batch_size]
+"""
+import sys
+import time
+from common import make_app, basic_auth_headers, report
+
+def build_payload(i):
+    return {
+        'type': 'income' if i % 3 else 'expense',
+        'amount': 10 + i % 90,
+        'description': f'Venda {i}',
+        'category': 'Vendas',
+        'payment_method': 'credito' if i % 2 else 'pix'
+    }
+
+def run_single_requests(client, headers, operations):
+    ids = []
+    start = time.perf_counter()
+    
+    # A shift's worth of creates, followed by edits and deletes of a third each
+    for i in range(operations):
+        response = client.post('/api/transactions', json=build_payload(i), headers=headers)
+        ids.append(response.get_json()['transaction']['id'])
+    for transaction_id in ids[:operations // 3]:
+        client.put(f'/api/transactions/{transaction_id}', json={'amount': 42}, headers=headers)
+    for transaction_id in ids[operations // 3:2 * operations // 3]:
+        client.delete(f'/api/transactions/{transaction_id}', headers=headers)
+    
+    return time.perf_counter() - start
+
+def run_batches(client, headers, operations, batch_size):
+    start = time.perf_counter()
+    
+    ids = []
+    for offset in range(0, operations, batch_size):
+        batch = [{'op': 'create', 'data': build_payload(i)} for i in range(offset, min(offset + batch_size, operations))]
+        response = client.post('/api/transactions/batch', json={'operations': batch}, headers=headers)
+        ids.extend(result['transaction']['id'] for result in response.get_json()['results'])
+    
+    edits = [{'op': 'update', 'id': i, 'data': {'amount': 42}} for i in ids[:operations // 3]]
+    edits += [{'op': 'delete', 'id': i} for i in ids[operations // 3:2 * operations // 3]]
+    for offset in range(0, len(edits), batch_size):
+        client.post('/api/transactions/batch', json={'operations': edits[offset:offset + batch_size]}, headers=headers)
+    
+    return time.perf_counter() - start
+
+def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    total_operations = operations + 2 * (operations // 3)
+    headers = basic_auth_headers()
+    
+    single_seconds = run_single_requests(make_app().test_client(), headers, operations)
+    batch_seconds = run_batches(make_app().test_client(), headers, operations, batch_size)
+    
+    report('one request per operation', total_operations, single_seconds)
+    report(f'batch endpoint ({batch_size} ops/request)', total_operations, batch_seconds)
+    print(f'speedup: {single_seconds / batch_seconds:.1f}x')
+
+if __name__ == '__main__':
+    main()
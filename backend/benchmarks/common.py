@@ -0,0 +1,45 @@
+import os
+import sys
+import base64
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from src.models.user_simple import db, User
+from src.routes.auth import auth_bp
+from src.routes.transactions import transactions_bp
+from src.routes.bills import bills_bp
+from src.routes.receivables import receivables_bp
+
+USERNAME = 'bench'
+PASSWORD = 'Bench12345'
+
+def make_app():
+    """Create the API on a throwaway SQLite file with one benchmark user"""
+    database_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'benchmark'
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{database_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(transactions_bp, url_prefix='/api')
+    app.register_blueprint(bills_bp, url_prefix='/api')
+    app.register_blueprint(receivables_bp, url_prefix='/api')
+    db.init_app(app)
+    
+    with app.app_context():
+        db.create_all()
+        user = User(username=USERNAME, email=f'{USERNAME}@example.com')
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+    
+    return app
+
+def basic_auth_headers():
+    credentials = base64.b64encode(f'{USERNAME}:{PASSWORD}'.encode('utf-8')).decode('utf-8')
+    return {'Authorization': f'Basic {credentials}'}
+
+def report(label, operations, seconds):
+    print(f'{label:<40} {operations:>7} ops {seconds:8.3f} s {operations / seconds:10.0f} ops/s')
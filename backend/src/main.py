@@ -12,6 +12,10 @@ from src.routes.auth import auth_bp
 from src.routes.transactions import transactions_bp
 from src.routes.bills import bills_bp
 from src.routes.receivables import receivables_bp
+from src.routes.search import search_bp
+from src.routes.calendar import calendar_bp
+from src.utils.migrations import run_migrations
+from src.utils.overdue import start_overdue_sweeper
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
@@ -25,6 +29,8 @@ app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(transactions_bp, url_prefix='/api')
 app.register_blueprint(bills_bp, url_prefix='/api')
 app.register_blueprint(receivables_bp, url_prefix='/api')
+app.register_blueprint(search_bp, url_prefix='/api')
+app.register_blueprint(calendar_bp, url_prefix='/api')
 
 # Database configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
@@ -34,11 +40,12 @@ db.init_app(app)
 # Import all models to ensure proper table creation
 from src.models.user_simple import User
 from src.models.transaction import Transaction
-from src.models.bill import Bill
+from src.models.bill import Bill, BillTemplate
 from src.models.receivable import Receivable, ReceivablePayment, Customer
 
 with app.app_context():
     db.create_all()
+    run_migrations()
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -65,4 +72,8 @@ def handle_unauthorized(e):
     return {"error": "Unauthorized access"}, 401
 
 if __name__ == '__main__':
+    # With debug on, the reloader runs this block in a watcher process as
+    # well; sweep only in the child that serves requests
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_overdue_sweeper(app)
     app.run(host='0.0.0.0', port=5000, debug=True)
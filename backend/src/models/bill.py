@@ -1,11 +1,27 @@
-from datetime import datetime, date
+import calendar
+from datetime import datetime, date, timedelta
 from src.models.user_simple import db
+from src.models.transaction import from_cents
+from src.utils.boleto import parse_bill_code
+from src.utils.cache import bump_data_version
 
 class Bill(db.Model):
     __tablename__ = 'bills'
+    __table_args__ = (
+        db.Index('ix_bills_user_status_due_date', 'user_id', 'status', 'due_date'),
+        db.Index('ix_bills_user_due_date', 'user_id', 'due_date'),
+        db.Index('ix_bills_user_category', 'user_id', 'category'),
+        # Covers /api/bills/summary so it never reads the table rows
+        db.Index('ix_bills_user_status_category_due_date_amount',
+                 'user_id', 'status', 'category', 'due_date', 'final_amount'),
+        # One bill per template occurrence, even if two requests materialize
+        # the same template at once
+        db.Index('ix_bills_template_due_date', 'template_id', 'due_date', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    template_id = db.Column(db.Integer, db.ForeignKey('bill_templates.id'), nullable=True)  # Conta recorrente de origem
     
     # Bill identification
     barcode = db.Column(db.String(48), nullable=True)  # Código de barras
@@ -46,6 +62,7 @@ class Bill(db.Model):
         return {
             'id': self.id,
             'user_id': self.user_id,
+            'template_id': self.template_id,
             'barcode': self.barcode,
             'line_code': self.line_code,
             'title': self.title,
@@ -69,22 +86,31 @@ class Bill(db.Model):
     @classmethod
     def create_from_barcode(cls, user_id, barcode_data):
         """
-        Create a bill from barcode data
-        This would typically integrate with a barcode processing service
+        Create a bill from a boleto or arrecadação barcode / linha digitável.
+        Values in barcode_data (title, company, category, amount, due_date,
+        notes) override the decoded ones, and are required when the code does
+        not carry them. Raises ValueError for invalid codes.
         """
-        # Mock implementation - in real app, this would parse barcode data
         bill_info = cls.parse_barcode(barcode_data)
         
+        amount = barcode_data.get('amount') or bill_info['amount']
+        due_date = barcode_data.get('due_date') or bill_info['due_date']
+        if not amount:
+            raise ValueError('original_amount is required: the code carries no amount')
+        if due_date is None:
+            raise ValueError('due_date is required: the code carries no due date')
+        
         bill = cls(
             user_id=user_id,
-            barcode=barcode_data.get('barcode'),
-            line_code=barcode_data.get('line_code'),
-            title=bill_info.get('title', 'Conta identificada por código de barras'),
-            company=bill_info.get('company', 'Empresa não identificada'),
-            category=bill_info.get('category', 'Outros'),
-            original_amount=bill_info.get('amount', 0),
-            final_amount=bill_info.get('amount', 0),
-            due_date=bill_info.get('due_date'),
+            barcode=bill_info['barcode'],
+            line_code=bill_info['line_code'],
+            title=barcode_data.get('title') or bill_info['title'],
+            company=barcode_data.get('company') or bill_info['company'],
+            category=barcode_data.get('category') or bill_info['category'],
+            original_amount=amount,
+            final_amount=amount,
+            due_date=due_date,
+            notes=barcode_data.get('notes'),
             status='pending'
         )
         
@@ -93,16 +119,29 @@ class Bill(db.Model):
     @staticmethod
     def parse_barcode(barcode_data):
         """
-        Parse barcode data to extract bill information
-        This is a mock implementation - real implementation would use proper barcode parsing
+        Decode the barcode (or, failing that, the line_code) in barcode_data
+        into bill fields. amount and due_date are None when the code does not
+        carry them. Raises ValueError for malformed codes or bad check digits.
         """
-        # Mock data based on common Brazilian bill formats
+        info = parse_bill_code(barcode_data.get('barcode') or barcode_data.get('line_code'))
+        
+        if info['kind'] == 'boleto':
+            company = info['bank_name'] or f"Banco {info['bank_code']}"
+            title = f'Boleto {company}'
+            category = 'Outros'
+        else:
+            company = f"Convênio {info['company_code']}"
+            title = f"Conta - {info['segment_name']}"
+            category = info['category']
+        
         return {
-            'title': 'Conta de Energia Elétrica',
-            'company': 'Companhia de Energia',
-            'category': 'Energia',
-            'amount': 150.75,
-            'due_date': datetime.now().date()
+            'barcode': info['barcode'],
+            'line_code': info['line_code'],
+            'title': title,
+            'company': company,
+            'category': category,
+            'amount': from_cents(info['amount_cents']) if info['amount_cents'] else None,
+            'due_date': info['due_date']
         }
     
     def calculate_final_amount(self):
@@ -135,3 +174,153 @@ class Bill(db.Model):
         delta = self.due_date - datetime.now().date()
         return delta.days
 
+# How far ahead recurring bills are materialized
+BILL_TEMPLATE_HORIZON_MONTHS = 3
+
+def add_months(day, months):
+    """Move a date by whole months, clamping the day to the month's length"""
+    month_index = day.year * 12 + day.month - 1 + months
+    year, month = divmod(month_index, 12)
+    month += 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+class BillTemplate(db.Model):
+    """A recurring bill (rent, energy, water...).
+    
+    Concrete Bill rows are only materialized up to a rolling horizon, so
+    storage grows with the horizon and not with the length of the recurrence.
+    """
+    __tablename__ = 'bill_templates'
+    __table_args__ = (
+        db.Index('ix_bill_templates_next_due_date', 'next_due_date'),
+        db.Index('ix_bill_templates_user_next_due_date', 'user_id', 'next_due_date'),
+    )
+    
+    FREQUENCIES = ('weekly', 'monthly', 'yearly')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    
+    # Fields copied to every bill
+    title = db.Column(db.String(200), nullable=False)
+    company = db.Column(db.String(200), nullable=True)
+    category = db.Column(db.String(100), nullable=False)
+    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    notes = db.Column(db.Text, nullable=True)
+    
+    # Recurrence rule: every `interval` weeks, months or years from
+    # start_date, up to end_date when set
+    frequency = db.Column(db.String(20), nullable=False, default='monthly')
+    interval = db.Column(db.Integer, nullable=False, default=1)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=True)
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    
+    # Materialization state: occurrences already turned into bills and the
+    # due date of the next one (None once the rule has ended)
+    materialized_count = db.Column(db.Integer, nullable=False, default=0)
+    next_due_date = db.Column(db.Date, nullable=True)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationship
+    user = db.relationship('User', backref=db.backref('bill_templates', lazy=True))
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'title': self.title,
+            'company': self.company,
+            'category': self.category,
+            'amount': float(self.amount) if self.amount else 0,
+            'notes': self.notes,
+            'frequency': self.frequency,
+            'interval': self.interval,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'active': self.active,
+            'next_due_date': self.next_due_date.isoformat() if self.next_due_date else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    def occurrence(self, index):
+        """Due date of the index-th occurrence (0 is start_date), or None past end_date"""
+        if self.frequency == 'weekly':
+            due_date = self.start_date + timedelta(weeks=index * self.interval)
+        elif self.frequency == 'yearly':
+            due_date = add_months(self.start_date, index * self.interval * 12)
+        else:
+            due_date = add_months(self.start_date, index * self.interval)
+        
+        if self.end_date is not None and due_date > self.end_date:
+            return None
+        return due_date
+    
+    def reset_schedule(self):
+        """Point next_due_date at the first occurrence not materialized yet"""
+        self.next_due_date = self.occurrence(self.materialized_count)
+    
+    def skip_before(self, day):
+        """Advance the schedule past occurrences due before day without
+        creating bills for them, e.g. those missed while the template was paused
+        """
+        while self.next_due_date is not None and self.next_due_date < day:
+            self.materialized_count += 1
+            self.reset_schedule()
+    
+    def bill_rows(self, horizon):
+        """Build the bills due up to horizon that are not materialized yet,
+        advancing the materialization state past them
+        """
+        today = date.today()
+        rows = []
+        
+        while self.next_due_date is not None and self.next_due_date <= horizon:
+            rows.append({
+                'user_id': self.user_id,
+                'template_id': self.id,
+                'title': self.title,
+                'company': self.company,
+                'category': self.category,
+                'original_amount': self.amount,
+                'discount_amount': 0,
+                'interest_amount': 0,
+                'final_amount': self.amount,
+                'due_date': self.next_due_date,
+                'status': 'overdue' if self.next_due_date < today else 'pending',
+                'payment_fee': 0,
+                'notes': self.notes
+            })
+            self.materialized_count += 1
+            self.reset_schedule()
+        
+        return rows
+    
+    @classmethod
+    def materialize(cls, user_id=None, horizon=None):
+        """Insert the bills of every active template due up to the horizon.
+        
+        Finding the templates with work to do is a range on next_due_date, and
+        all new bills go in with one batched INSERT. Bills that already exist
+        for a template occurrence are skipped. Runs in the caller's session
+        transaction, bumping the data version of the users that got bills,
+        and returns the number of bills built.
+        """
+        horizon = horizon or add_months(date.today(), BILL_TEMPLATE_HORIZON_MONTHS)
+        query = cls.query.filter(cls.active.is_(True), cls.next_due_date <= horizon)
+        if user_id is not None:
+            query = query.filter(cls.user_id == user_id)
+        
+        rows = []
+        for template in query.all():
+            rows.extend(template.bill_rows(horizon))
+        
+        if rows:
+            db.session.execute(Bill.__table__.insert().prefix_with('OR IGNORE'), rows)
+            for user_id in {row['user_id'] for row in rows}:
+                bump_data_version(user_id)
+        return len(rows)
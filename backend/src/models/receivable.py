@@ -1,13 +1,36 @@
+import unicodedata
 from datetime import datetime, date
 from src.models.user_simple import db
+from src.models.transaction import to_cents
+
+def normalize_customer_name(name):
+    """Lookup key for a customer name: accents removed, case folded and
+    whitespace collapsed, so "José  Silva" and "jose silva" are one customer
+    """
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
 
 class Receivable(db.Model):
     __tablename__ = 'receivables'
+    __table_args__ = (
+        db.Index('ix_receivables_user_status_due_date', 'user_id', 'status', 'due_date'),
+        db.Index('ix_receivables_user_due_date', 'user_id', 'due_date'),
+        db.Index('ix_receivables_user_type', 'user_id', 'type'),
+        db.Index('ix_receivables_user_customer_name', 'user_id', 'customer_name'),
+        # Customer statements and stats, and the customer_id backfill
+        db.Index('ix_receivables_customer_due_date', 'customer_id', 'due_date'),
+        # Covers /api/receivables/summary so its totals never read table rows
+        db.Index('ix_receivables_user_status_type_due_date_amounts',
+                 'user_id', 'status', 'type', 'due_date',
+                 'original_amount', 'paid_amount', 'remaining_amount'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     # Customer information
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=True)
     customer_name = db.Column(db.String(200), nullable=False)
     customer_phone = db.Column(db.String(20), nullable=True)
     customer_email = db.Column(db.String(200), nullable=True)
@@ -50,10 +73,14 @@ class Receivable(db.Model):
     user = db.relationship('User', backref=db.backref('receivables', lazy=True))
     payments = db.relationship('ReceivablePayment', backref='receivable', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include_payments=True):
+        # Work out the overdue state once and derive the other fields from it
+        days_overdue = self.days_overdue()
+        
+        data = {
             'id': self.id,
             'user_id': self.user_id,
+            'customer_id': self.customer_id,
             'customer_name': self.customer_name,
             'customer_phone': self.customer_phone,
             'customer_email': self.customer_email,
@@ -77,11 +104,15 @@ class Receivable(db.Model):
             'machine_location': self.machine_location,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'payments': [payment.to_dict() for payment in self.payments],
-            'is_overdue': self.is_overdue(),
-            'days_overdue': self.days_overdue(),
-            'total_with_fees': self.calculate_total_with_fees()
+            'is_overdue': days_overdue > 0,
+            'days_overdue': days_overdue,
+            'total_with_fees': self.calculate_total_with_fees(days_overdue)
         }
+        
+        if include_payments:
+            data['payments'] = [payment.to_dict() for payment in self.payments]
+        
+        return data
     
     def is_overdue(self):
         """Check if receivable is overdue"""
@@ -90,7 +121,7 @@ class Receivable(db.Model):
         return self.due_date < date.today()
     
     def days_overdue(self):
-        """Calculate days overdue"""
+        """Calculate days overdue (0 when not overdue)"""
         if not self.is_overdue():
             return 0
         delta = date.today() - self.due_date
@@ -103,13 +134,17 @@ class Receivable(db.Model):
         delta = self.due_date - date.today()
         return delta.days
     
-    def calculate_total_with_fees(self):
-        """Calculate total amount including interest and late fees"""
+    def calculate_total_with_fees(self, days_overdue=None):
+        """Calculate total amount including interest and late fees.
+        
+        days_overdue can be passed in when the caller already computed it.
+        """
         base_amount = float(self.remaining_amount or 0)
+        if days_overdue is None:
+            days_overdue = self.days_overdue()
         
-        if self.is_overdue() and self.interest_rate > 0:
+        if days_overdue > 0 and self.interest_rate > 0:
             # Calculate interest for overdue period
-            days_overdue = self.days_overdue()
             monthly_rate = float(self.interest_rate) / 100
             daily_rate = monthly_rate / 30
             interest = base_amount * daily_rate * days_overdue
@@ -155,6 +190,9 @@ class Receivable(db.Model):
 
 class ReceivablePayment(db.Model):
     __tablename__ = 'receivable_payments'
+    __table_args__ = (
+        db.Index('ix_receivable_payments_receivable_id', 'receivable_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     receivable_id = db.Column(db.Integer, db.ForeignKey('receivables.id'), nullable=False)
@@ -186,12 +224,21 @@ class ReceivablePayment(db.Model):
 
 class Customer(db.Model):
     __tablename__ = 'customers'
+    __table_args__ = (
+        db.Index('ix_customers_user_name', 'user_id', 'name'),
+        db.Index('ix_customers_user_name_key', 'user_id', 'name_key', unique=True),
+        # Customer directory: prefix search and sorting by pending amount
+        db.Index('ix_customers_user_phone', 'user_id', 'phone'),
+        db.Index('ix_customers_user_document', 'user_id', 'document'),
+        db.Index('ix_customers_user_total_pending', 'user_id', 'total_pending', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     # Customer information
     name = db.Column(db.String(200), nullable=False)
+    name_key = db.Column(db.String(200), nullable=True)  # normalize_customer_name(name)
     phone = db.Column(db.String(20), nullable=True)
     email = db.Column(db.String(200), nullable=True)
     address = db.Column(db.Text, nullable=True)
@@ -217,6 +264,8 @@ class Customer(db.Model):
     # Relationship
     user = db.relationship('User', backref=db.backref('customers', lazy=True))
     
+    _stats_update = None
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -237,19 +286,91 @@ class Customer(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
     
-    def update_stats(self):
-        """Update customer statistics based on receivables"""
-        from sqlalchemy import func
+    @staticmethod
+    def stats_delta(receivable, sign=1):
+        """Build the stats delta that adds (sign=1) or removes (sign=-1) a
+        receivable from its customer's totals, in cents
+        """
+        return {
+            'customer_id': receivable.customer_id,
+            'purchases_cents': sign * to_cents(receivable.original_amount or 0),
+            'paid_cents': sign * to_cents(receivable.paid_amount or 0),
+            'pending_cents': 0 if receivable.status == 'cancelled' else sign * to_cents(receivable.remaining_amount or 0)
+        }
+    
+    @classmethod
+    def add_receivable(cls, receivable):
+        """Count a new or updated receivable in its customer's stats"""
+        cls.apply_stats_deltas([cls.stats_delta(receivable)])
+    
+    @classmethod
+    def remove_receivable(cls, receivable):
+        """Take a receivable out of its customer's stats, using its current values"""
+        cls.apply_stats_deltas([cls.stats_delta(receivable, sign=-1)])
+    
+    @classmethod
+    def apply_stats_deltas(cls, deltas):
+        """Add deltas to the customers' totals within the current session transaction.
         
-        # Get receivables for this customer
-        receivables = Receivable.query.filter_by(
-            user_id=self.user_id,
-            customer_name=self.name
-        ).all()
+        Deltas for the same customer are merged first, so removing and
+        re-adding an edited receivable costs at most one UPDATE per customer.
+        """
+        merged = {}
+        for delta in deltas:
+            key = delta['customer_id']
+            if key is None:
+                continue
+            if key not in merged:
+                merged[key] = dict(delta)
+            else:
+                for field in ('purchases_cents', 'paid_cents', 'pending_cents'):
+                    merged[key][field] += delta[field]
         
-        self.total_purchases = sum([float(r.original_amount) for r in receivables])
-        self.total_paid = sum([float(r.paid_amount) for r in receivables])
-        self.total_pending = sum([float(r.remaining_amount) for r in receivables if r.status != 'cancelled'])
+        changed = [
+            delta for delta in merged.values()
+            if delta['purchases_cents'] or delta['paid_cents'] or delta['pending_cents']
+        ]
+        if not changed:
+            return
         
-        self.updated_at = datetime.utcnow()
-
+        db.session.flush()
+        db.session.execute(cls._stats_update_statement(), changed)
+    
+    @classmethod
+    def _stats_update_statement(cls):
+        if cls._stats_update is None:
+            cls._stats_update = db.text(
+                f'UPDATE {cls.__tablename__} SET '
+                'total_purchases = ROUND(COALESCE(total_purchases, 0) + :purchases_cents / 100.0, 2), '
+                'total_paid = ROUND(COALESCE(total_paid, 0) + :paid_cents / 100.0, 2), '
+                'total_pending = ROUND(COALESCE(total_pending, 0) + :pending_cents / 100.0, 2) '
+                'WHERE id = :customer_id'
+            )
+        return cls._stats_update
+    
+    @classmethod
+    def rebuild_stats(cls, user_id=None):
+        """Recompute every customer's totals from the receivables table with
+        one UPDATE ... FROM (SELECT ... GROUP BY)
+        """
+        stats = db.select(
+            cls.id.label('customer_id'),
+            db.func.coalesce(db.func.sum(Receivable.original_amount), 0).label('total_purchases'),
+            db.func.coalesce(db.func.sum(Receivable.paid_amount), 0).label('total_paid'),
+            db.func.coalesce(db.func.sum(db.case(
+                (Receivable.status != 'cancelled', Receivable.remaining_amount), else_=0
+            )), 0).label('total_pending')
+        ).select_from(cls).outerjoin(Receivable, Receivable.customer_id == cls.id)
+        if user_id is not None:
+            stats = stats.where(cls.user_id == user_id)
+        stats = stats.group_by(cls.id).subquery()
+        
+        db.session.execute(
+            cls.__table__.update()
+            .where(cls.id == stats.c.customer_id)
+            .values(
+                total_purchases=db.func.round(stats.c.total_purchases, 2),
+                total_paid=db.func.round(stats.c.total_paid, 2),
+                total_pending=db.func.round(stats.c.total_pending, 2)
+            )
+        )
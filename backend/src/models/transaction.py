@@ -1,18 +1,63 @@
 from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from src.models.user_simple import db
 
+# Largest absolute amount accepted, in reais
+MAX_AMOUNT = 10 ** 12
+
+def to_cents(value):
+    """Convert an amount in reais (float, Decimal or str) to integer cents.
+    
+    Raises ValueError for amounts that are not finite numbers below MAX_AMOUNT.
+    """
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f'Invalid amount: {value}')
+    if not amount.is_finite() or abs(amount) >= MAX_AMOUNT:
+        raise ValueError(f'Invalid amount: {value}')
+    return int((amount * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+def from_cents(cents):
+    """Convert integer cents back to reais as returned by the API"""
+    return cents / 100
+
+class Cents(db.TypeDecorator):
+    """Money stored as an INTEGER number of cents and exposed as reais.
+    
+    Sums over these columns run as exact integer arithmetic in SQLite. Wrap
+    aggregates in db.type_coerce(..., db.Integer) to get the raw cents.
+    """
+    impl = db.Integer
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return to_cents(value)
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return from_cents(value)
+
 class Transaction(db.Model):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        db.Index('ix_transactions_user_date', 'user_id', 'date'),
+        db.Index('ix_transactions_user_type_date', 'user_id', 'type', 'date'),
+        db.Index('ix_transactions_user_category_date', 'user_id', 'category', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     type = db.Column(db.String(20), nullable=False)  # 'income' or 'expense'
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Cents, nullable=False)
     description = db.Column(db.String(255), nullable=False)
     category = db.Column(db.String(100), nullable=False)
     payment_method = db.Column(db.String(50), nullable=True)  # PIX, Cartão, Dinheiro, etc.
-    card_fee = db.Column(db.Float, default=0.0)  # Taxa do cartão
-    net_amount = db.Column(db.Float, nullable=False)  # Valor líquido após taxas
+    card_fee = db.Column(Cents, default=0.0)  # Taxa do cartão
+    net_amount = db.Column(Cents, nullable=False)  # Valor líquido após taxas
     date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     notes = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -71,3 +116,147 @@ class Category(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+
+# Columns identifying a rollup group (uq_transaction_daily_rollups_key)
+ROLLUP_KEY_FIELDS = ('user_id', 'day', 'type', 'category', 'payment_method')
+
+class TransactionDailyRollup(db.Model):
+    __tablename__ = 'transaction_daily_rollups'
+    __table_args__ = (
+        db.UniqueConstraint(
+            'user_id', 'day', 'type', 'category', 'payment_method',
+            name='uq_transaction_daily_rollups_key'
+        ),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    type = db.Column(db.String(20), nullable=False)
+    category = db.Column(db.String(100), nullable=False)
+    payment_method = db.Column(db.String(50), nullable=False, default='')  # '' when not informed
+    amount_cents = db.Column(db.Integer, nullable=False, default=0)
+    net_amount_cents = db.Column(db.Integer, nullable=False, default=0)
+    card_fee_cents = db.Column(db.Integer, nullable=False, default=0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    _upsert = None
+    _delete_empty = None
+    
+    def __repr__(self):
+        return f'<TransactionDailyRollup {self.user_id} {self.day}: {self.type}/{self.category}>'
+    
+    @staticmethod
+    def delta_for(transaction, sign=1):
+        """Build the rollup delta that adds (sign=1) or removes (sign=-1) a transaction"""
+        return {
+            'user_id': transaction.user_id,
+            'day': transaction.date.date(),
+            'type': transaction.type,
+            'category': transaction.category,
+            'payment_method': transaction.payment_method or '',
+            'amount_cents': sign * to_cents(transaction.amount or 0),
+            'net_amount_cents': sign * to_cents(transaction.net_amount or 0),
+            'card_fee_cents': sign * to_cents(transaction.card_fee or 0),
+            'transaction_count': sign
+        }
+    
+    @classmethod
+    def add(cls, transaction):
+        """Count a new or updated transaction in its day's rollup"""
+        cls.apply_deltas([cls.delta_for(transaction)])
+    
+    @classmethod
+    def remove(cls, transaction):
+        """Take a transaction out of its day's rollup, using its current values"""
+        cls.apply_deltas([cls.delta_for(transaction, sign=-1)])
+    
+    @classmethod
+    def _upsert_statement(cls):
+        """Build (once) the INSERT ... ON CONFLICT DO UPDATE used to apply deltas.
+        
+        Written as text so SQLAlchemy compiles it once instead of per call.
+        """
+        if cls._upsert is None:
+            cls._upsert = db.text(
+                f'INSERT INTO {cls.__tablename__} '
+                '(user_id, day, type, category, payment_method, '
+                'amount_cents, net_amount_cents, card_fee_cents, transaction_count) '
+                'VALUES (:user_id, :day, :type, :category, :payment_method, '
+                ':amount_cents, :net_amount_cents, :card_fee_cents, :transaction_count) '
+                'ON CONFLICT (user_id, day, type, category, payment_method) DO UPDATE SET '
+                'amount_cents = amount_cents + excluded.amount_cents, '
+                'net_amount_cents = net_amount_cents + excluded.net_amount_cents, '
+                'card_fee_cents = card_fee_cents + excluded.card_fee_cents, '
+                'transaction_count = transaction_count + excluded.transaction_count'
+            ).bindparams(db.bindparam('day', type_=db.Date))
+        return cls._upsert
+    
+    @classmethod
+    def _delete_empty_statement(cls):
+        """Build (once) the DELETE of one rollup group left without transactions"""
+        if cls._delete_empty is None:
+            cls._delete_empty = db.text(
+                f'DELETE FROM {cls.__tablename__} WHERE '
+                + ' AND '.join(f'{field} = :{field}' for field in ROLLUP_KEY_FIELDS)
+                + ' AND transaction_count <= 0'
+            ).bindparams(db.bindparam('day', type_=db.Date))
+        return cls._delete_empty
+    
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """Upsert deltas into the rollup within the current session transaction.
+        
+        Runs as part of the caller's unit of work, so the rollup commits or
+        rolls back together with the transaction rows it describes.
+        """
+        if not deltas:
+            return
+        
+        db.session.execute(cls._upsert_statement(), deltas)
+        
+        # Drop groups whose last transaction was removed, looking only at the
+        # groups that lost transactions, each one a unique key lookup
+        removed = [
+            {field: delta[field] for field in ROLLUP_KEY_FIELDS}
+            for delta in deltas if delta['transaction_count'] < 0
+        ]
+        if removed:
+            db.session.execute(cls._delete_empty_statement(), removed)
+    
+    @classmethod
+    def rebuild(cls, user_id=None):
+        """Recompute the rollup from the transactions table with one GROUP BY"""
+        delete = cls.__table__.delete()
+        source = db.select(
+            Transaction.user_id,
+            db.func.date(Transaction.date),
+            Transaction.type,
+            Transaction.category,
+            db.func.coalesce(Transaction.payment_method, ''),
+            db.func.coalesce(db.func.sum(db.type_coerce(Transaction.amount, db.Integer)), 0),
+            db.func.coalesce(db.func.sum(db.type_coerce(Transaction.net_amount, db.Integer)), 0),
+            db.func.coalesce(db.func.sum(db.type_coerce(Transaction.card_fee, db.Integer)), 0),
+            db.func.count(Transaction.id)
+        )
+        
+        if user_id is not None:
+            delete = delete.where(cls.user_id == user_id)
+            source = source.where(Transaction.user_id == user_id)
+        
+        source = source.group_by(
+            Transaction.user_id,
+            db.func.date(Transaction.date),
+            Transaction.type,
+            Transaction.category,
+            db.func.coalesce(Transaction.payment_method, '')
+        )
+        
+        db.session.execute(delete)
+        db.session.execute(
+            cls.__table__.insert().from_select(
+                ['user_id', 'day', 'type', 'category', 'payment_method',
+                 'amount_cents', 'net_amount_cents', 'card_fee_cents', 'transaction_count'],
+                source
+            )
+        )
@@ -12,6 +12,8 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     is_active = db.Column(db.Boolean, default=True)
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped on every financial write
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped to revoke issued tokens
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     def set_password(self, password):
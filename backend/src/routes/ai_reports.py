@@ -84,11 +84,11 @@ def get_financial_data(user_id, period='30'):
         # Bills analysis
         pending_bills = [b for b in bills if b.status in ['pending', 'overdue']]
         paid_bills = [b for b in bills if b.status == 'paid']
-        total_bills_pending = sum([float(b.amount) for b in pending_bills])
-        total_bills_paid = sum([float(b.amount) for b in paid_bills])
+        total_bills_pending = sum([float(b.final_amount) for b in pending_bills])
+        total_bills_paid = sum([float(b.final_amount) for b in paid_bills])
         
         # Receivables analysis
-        pending_receivables = [r for r in receivables if r.status in ['pending', 'partial']]
+        pending_receivables = [r for r in receivables if r.status in ['pending', 'partial', 'overdue']]
         paid_receivables = [r for r in receivables if r.status == 'paid']
         overdue_receivables = [r for r in receivables if r.is_overdue()]
         
@@ -1,6 +1,9 @@
 from flask import Blueprint, jsonify, request
 from src.models.user_simple import User, db
-from src.utils.auth import basic_auth_required, get_basic_auth_user
+from src.utils.auth import (
+    basic_auth_required, get_basic_auth_user, forget_user_credentials,
+    issue_token, authenticate_token, AUTH_TOKEN_TTL
+)
 import re
 import base64
 
@@ -102,18 +105,40 @@ def login():
         credentials = f"{username_or_email}:{password}"
         encoded_credentials = base64.b64encode(credentials.encode('utf-8')).decode('utf-8')
         
-        return jsonify({
+        response = {
             'message': 'Login successful',
             'credentials': encoded_credentials,
             'user': user.to_dict()
-        }), 200
+        }
+        
+        # Optionally issue a signed session token to send as "Bearer <token>"
+        # instead of the credentials, skipping the password check per request
+        if data.get('issue_token'):
+            response['token'] = issue_token(user)
+            response['token_type'] = 'Bearer'
+            response['expires_in'] = AUTH_TOKEN_TTL
+        
+        return jsonify(response), 200
         
     except Exception as e:
         return jsonify({'error': 'Login failed'}), 500
 
 @auth_bp.route('/logout', methods=['POST'])
 def logout():
-    # With Basic Auth, logout is handled client-side
+    # With Basic Auth, logout is handled client-side. A session token is
+    # revoked, together with every other token issued to the same user.
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        try:
+            user = authenticate_token(auth_header[len('Bearer '):].strip())
+            if user:
+                user.token_version = User.token_version + 1
+                db.session.commit()
+                forget_user_credentials(user.id)
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': 'Logout failed'}), 500
+    
     return jsonify({'message': 'Successfully logged out'}), 200
 
 @auth_bp.route('/profile', methods=['GET'])
@@ -158,7 +183,20 @@ def update_profile(user):
             
             user.email = new_email
         
+        # Update password if provided, confirming the current one
+        if 'password' in data:
+            if not user.check_password(data.get('current_password', '')):
+                return jsonify({'error': 'Current password is incorrect'}), 400
+            
+            is_valid, message = validate_password(data['password'])
+            if not is_valid:
+                return jsonify({'error': message}), 400
+            
+            user.set_password(data['password'])
+            user.token_version = User.token_version + 1
+        
         db.session.commit()
+        forget_user_credentials(user.id)
         
         return jsonify({
             'message': 'Profile updated successfully',
@@ -0,0 +1,89 @@
+from flask import Blueprint, request, jsonify
+from datetime import date, timedelta
+from sqlalchemy import Integer, cast, func, literal, union_all
+from src.models.user_simple import db
+from src.models.bill import Bill
+from src.models.receivable import Receivable
+from src.models.transaction import from_cents
+from src.utils.auth import basic_auth_required
+from src.utils.cache import cached_summary
+
+calendar_bp = Blueprint('calendar', __name__)
+
+CALENDAR_DEFAULT_DAYS = 30
+CALENDAR_MAX_DAYS = 366
+
+# Statuses still waiting to be paid or received; 'overdue' is written by the
+# overdue sweeper
+CALENDAR_BILL_STATUSES = ('pending', 'overdue')
+CALENDAR_RECEIVABLE_STATUSES = ('pending', 'partial', 'overdue')
+
+def due_date_totals(kind, model, amount, statuses, user_id, start, end):
+    """Count and cents per due date of one user's rows in the given statuses"""
+    return db.session.query(
+        literal(kind).label('kind'),
+        model.due_date.label('due_date'),
+        func.count().label('count'),
+        func.sum(cast(func.round(amount * 100), Integer)).label('amount')
+    ).filter(
+        model.user_id == user_id,
+        model.status.in_(statuses),
+        model.due_date.between(start, end)
+    ).group_by(model.due_date)
+
+@calendar_bp.route('/calendar', methods=['GET'])
+@basic_auth_required
+@cached_summary
+def get_calendar(user):
+    """Open bills and receivables per due date.
+
+    Query: from and to (ISO dates, inclusive). from defaults to today and to
+    to 30 days later. Only days with something due are returned, oldest first.
+    Receivable amounts are what is still to be received.
+    """
+    try:
+        try:
+            start = date.fromisoformat(request.args['from']) if request.args.get('from') else date.today()
+            end = date.fromisoformat(request.args['to']) if request.args.get('to') else start + timedelta(days=CALENDAR_DEFAULT_DAYS)
+        except ValueError:
+            return jsonify({'error': 'Invalid date format'}), 400
+        
+        if end < start:
+            return jsonify({'error': 'to must not be before from'}), 400
+        if (end - start).days >= CALENDAR_MAX_DAYS:
+            return jsonify({'error': f'The range can span at most {CALENDAR_MAX_DAYS} days'}), 400
+        
+        # Both halves are due date range scans on the (user_id, status,
+        # due_date) or (user_id, due_date) index, sent as one statement
+        rows = db.session.execute(union_all(
+            due_date_totals('bills', Bill, Bill.final_amount, CALENDAR_BILL_STATUSES, user.id, start, end),
+            due_date_totals('receivables', Receivable, Receivable.remaining_amount, CALENDAR_RECEIVABLE_STATUSES, user.id, start, end)
+        )).all()
+        
+        days = {}
+        totals = {kind: {'count': 0, 'amount': 0} for kind in ('bills', 'receivables')}
+        for kind, due_date, count, amount in rows:
+            if due_date not in days:
+                days[due_date] = {kind: {'count': 0, 'amount': 0} for kind in totals}
+            days[due_date][kind] = {'count': count, 'amount': amount or 0}
+            totals[kind]['count'] += count
+            totals[kind]['amount'] += amount or 0
+        
+        def totals_to_dict(day_totals):
+            return {
+                kind: {'count': values['count'], 'amount': from_cents(values['amount'])}
+                for kind, values in day_totals.items()
+            }
+        
+        return jsonify({
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'days': [
+                {'date': str(due_date), **totals_to_dict(days[due_date])}
+                for due_date in sorted(days)
+            ],
+            'totals': totals_to_dict(totals)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
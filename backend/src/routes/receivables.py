@@ -1,11 +1,51 @@
+import click
 from flask import Blueprint, request, jsonify
 from datetime import datetime, date
+from sqlalchemy import Integer, and_, or_, case, cast, false, func, tuple_
+from sqlalchemy.orm import selectinload
 from src.models.user_simple import db, User
-from src.models.receivable import Receivable, ReceivablePayment, Customer
+from src.models.receivable import Receivable, ReceivablePayment, Customer, normalize_customer_name
+from src.models.transaction import from_cents
 from src.utils.auth import basic_auth_required
+from src.utils.cache import bump_data_version, cached_summary
+from src.utils.export import EXPORT_FORMATS, stream_export
+from src.utils.pagination import encode_cursor, decode_cursor
 
 receivables_bp = Blueprint('receivables', __name__)
 
+TOP_CUSTOMERS_LIMIT = 10
+
+# Statuses counted as pending in the summary: 'overdue' rows were pending
+# until the overdue sweeper moved them. Partial ones have their own count.
+RECEIVABLE_PENDING_STATUSES = ('pending', 'overdue')
+
+CUSTOMERS_MAX_LIMIT = 200
+
+# Aging buckets: (label, last day overdue), the last one open-ended
+AGING_BUCKETS = (
+    ('0-30', 30),
+    ('31-60', 60),
+    ('61-90', 90),
+    ('90+', None)
+)
+AGING_MAX_CUSTOMERS = 500
+
+# sort parameter -> (Customer column, descending)
+CUSTOMER_SORTS = {
+    'name': ('name_key', False),
+    'total_pending': ('total_pending', True)
+}
+
+CUSTOMER_FIELDS = (
+    'id', 'user_id', 'name', 'phone', 'email', 'address', 'document',
+    'total_purchases', 'total_paid', 'total_pending', 'status', 'credit_limit',
+    'notes', 'tags', 'created_at', 'updated_at'
+)
+
+def cents(column):
+    """SQL expression for a Numeric (stored as REAL) money column in integer cents"""
+    return cast(func.round(column * 100), Integer)
+
 @receivables_bp.route('/api/receivables', methods=['GET'])
 @basic_auth_required
 def get_receivables(user):
@@ -15,29 +55,11 @@ def get_receivables(user):
         
         # Get query parameters
         status = request.args.get('status')  # pending, partial, paid, overdue, all
-        type_filter = request.args.get('type')  # fiado, machine_receipt, invoice, other
-        customer = request.args.get('customer')
         limit = request.args.get('limit', 50, type=int)
         offset = request.args.get('offset', 0, type=int)
         
         # Build query
-        query = Receivable.query.filter_by(user_id=current_user_id)
-        
-        if status and status != 'all':
-            if status == 'overdue':
-                # Get receivables that are overdue
-                query = query.filter(
-                    Receivable.status.in_(['pending', 'partial']),
-                    Receivable.due_date < date.today()
-                )
-            else:
-                query = query.filter_by(status=status)
-        
-        if type_filter:
-            query = query.filter_by(type=type_filter)
-        
-        if customer:
-            query = query.filter(Receivable.customer_name.ilike(f'%{customer}%'))
+        query = build_receivables_query(current_user_id, request.args)
         
         # Order by due date (ascending for pending, descending for paid)
         if status == 'paid':
@@ -45,8 +67,9 @@ def get_receivables(user):
         else:
             query = query.order_by(Receivable.due_date.asc())
         
-        # Apply pagination
-        receivables = query.offset(offset).limit(limit).all()
+        # Apply pagination, loading the page's payments with one extra
+        # SELECT ... WHERE receivable_id IN (...) instead of one per row
+        receivables = query.options(selectinload(Receivable.payments)).offset(offset).limit(limit).all()
         
         # Get total count
         total_count = query.count()
@@ -63,6 +86,69 @@ def get_receivables(user):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def build_receivables_query(user_id, args):
+    """Build the filtered receivable query shared by the list and export endpoints"""
+    status = args.get('status')  # pending, partial, paid, overdue, all
+    type_filter = args.get('type')  # fiado, machine_receipt, invoice, other
+    customer = args.get('customer')
+    customer_id = args.get('customer_id', type=int)
+    
+    query = Receivable.query.filter_by(user_id=user_id)
+    
+    if status and status != 'all':
+        if status == 'overdue':
+            # Receivables marked by the overdue sweeper, plus pending or
+            # partially paid ones past due: (user_id, status, due_date) ranges
+            query = query.filter(or_(
+                Receivable.status == 'overdue',
+                and_(Receivable.status.in_(['pending', 'partial']), Receivable.due_date < date.today())
+            ))
+        else:
+            query = query.filter_by(status=status)
+    
+    if type_filter:
+        query = query.filter_by(type=type_filter)
+    
+    if customer_id:
+        query = query.filter_by(customer_id=customer_id)
+    
+    if customer:
+        # Match on the small customers table, accent and case insensitively,
+        # then fetch the receivables through the customer_id index
+        matching_customers = db.session.query(Customer.id).filter(
+            Customer.user_id == user_id,
+            Customer.name_key.contains(normalize_customer_name(customer), autoescape=True)
+        )
+        query = query.filter(Receivable.customer_id.in_(matching_customers))
+    
+    return query
+
+@receivables_bp.route('/api/receivables/export', methods=['GET'])
+@basic_auth_required
+def export_receivables(user):
+    """Stream the filtered receivables as CSV or NDJSON.
+    
+    Payments are left out: they are nested lists that do not fit a flat
+    row, and loading them would cost one query per receivable.
+    """
+    try:
+        file_format = request.args.get('format', 'csv').lower()
+        if file_format not in EXPORT_FORMATS:
+            return jsonify({'error': 'Unsupported format. Use csv or ndjson'}), 400
+        
+        query = build_receivables_query(user.id, request.args)
+        query = query.order_by(Receivable.due_date.asc(), Receivable.id.asc())
+        
+        return stream_export(
+            query,
+            lambda receivable: receivable.to_dict(include_payments=False),
+            file_format,
+            'receivables'
+        )
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @receivables_bp.route('/api/receivables', methods=['POST'])
 @basic_auth_required
 def create_receivable(user):
@@ -110,10 +196,15 @@ def create_receivable(user):
         )
         
         db.session.add(receivable)
-        db.session.commit()
         
-        # Update or create customer record
-        update_customer_record(current_user_id, data['customer_name'], data)
+        # Update or create the customer record and count the receivable in
+        # its stats, in the same transaction
+        customer = update_customer_record(current_user_id, data['customer_name'], data)
+        receivable.customer_id = customer.id
+        Customer.add_receivable(receivable)
+        
+        bump_data_version(current_user_id)
+        db.session.commit()
         
         return jsonify({
             'message': 'Receivable created successfully',
@@ -126,7 +217,7 @@ def create_receivable(user):
 
 @receivables_bp.route('/api/receivables/<int:receivable_id>', methods=['GET'])
 @basic_auth_required
-def get_receivable(receivable_id):
+def get_receivable(user, receivable_id):
     """Get a specific receivable"""
     try:
         current_user_id = user.id
@@ -142,7 +233,7 @@ def get_receivable(receivable_id):
 
 @receivables_bp.route('/api/receivables/<int:receivable_id>', methods=['PUT'])
 @basic_auth_required
-def update_receivable(receivable_id):
+def update_receivable(user, receivable_id):
     """Update a receivable"""
     try:
         current_user_id = user.id
@@ -152,9 +243,13 @@ def update_receivable(receivable_id):
         if not receivable:
             return jsonify({'error': 'Receivable not found'}), 404
         
+        # Take the old values out of the customer stats before changing them
+        stats_before = Customer.stats_delta(receivable, sign=-1)
+        
         # Update fields
         if 'customer_name' in data:
             receivable.customer_name = data['customer_name']
+            receivable.customer_id = update_customer_record(current_user_id, data['customer_name'], data).id
         if 'customer_phone' in data:
             receivable.customer_phone = data['customer_phone']
         if 'customer_email' in data:
@@ -174,6 +269,9 @@ def update_receivable(receivable_id):
             receivable.late_fee = float(data['late_fee'])
         if 'due_date' in data:
             receivable.due_date = datetime.strptime(data['due_date'], '%Y-%m-%d').date()
+            # A new due date can move an unpaid receivable in or out of overdue
+            if receivable.status in ('pending', 'overdue'):
+                receivable.status = 'overdue' if receivable.is_overdue() else 'pending'
         if 'payment_terms' in data:
             receivable.payment_terms = data['payment_terms']
         if 'notes' in data:
@@ -182,7 +280,9 @@ def update_receivable(receivable_id):
             receivable.tags = ','.join(data['tags']) if data['tags'] else None
         
         receivable.updated_at = datetime.utcnow()
+        Customer.apply_stats_deltas([stats_before, Customer.stats_delta(receivable)])
         
+        bump_data_version(current_user_id)
         db.session.commit()
         
         return jsonify({
@@ -196,7 +296,7 @@ def update_receivable(receivable_id):
 
 @receivables_bp.route('/api/receivables/<int:receivable_id>/payments', methods=['POST'])
 @basic_auth_required
-def add_payment(receivable_id):
+def add_payment(user, receivable_id):
     """Add a payment to a receivable"""
     try:
         current_user_id = user.id
@@ -220,7 +320,8 @@ def add_payment(receivable_id):
         if amount > receivable.remaining_amount:
             return jsonify({'error': 'Payment amount exceeds remaining balance'}), 400
         
-        # Add payment
+        # Add payment, moving its amount from pending to paid in the customer stats
+        stats_before = Customer.stats_delta(receivable, sign=-1)
         payment = receivable.add_payment(
             amount=amount,
             payment_method=data['payment_method'],
@@ -230,6 +331,8 @@ def add_payment(receivable_id):
         if 'receipt_number' in data:
             payment.receipt_number = data['receipt_number']
         
+        Customer.apply_stats_deltas([stats_before, Customer.stats_delta(receivable)])
+        bump_data_version(current_user_id)
         db.session.commit()
         
         return jsonify({
@@ -244,7 +347,7 @@ def add_payment(receivable_id):
 
 @receivables_bp.route('/api/receivables/<int:receivable_id>', methods=['DELETE'])
 @basic_auth_required
-def delete_receivable(receivable_id):
+def delete_receivable(user, receivable_id):
     """Delete a receivable"""
     try:
         current_user_id = user.id
@@ -253,7 +356,9 @@ def delete_receivable(receivable_id):
         if not receivable:
             return jsonify({'error': 'Receivable not found'}), 404
         
+        Customer.remove_receivable(receivable)
         db.session.delete(receivable)
+        bump_data_version(current_user_id)
         db.session.commit()
         
         return jsonify({'message': 'Receivable deleted successfully'}), 200
@@ -264,67 +369,103 @@ def delete_receivable(receivable_id):
 
 @receivables_bp.route('/api/receivables/summary', methods=['GET'])
 @basic_auth_required
+@cached_summary
 def get_receivables_summary(user):
     """Get receivables summary statistics"""
     try:
         current_user_id = user.id
         
-        # Get all receivables for user
-        receivables = Receivable.query.filter_by(user_id=current_user_id).all()
-        
-        # Calculate statistics
-        total_receivables = len(receivables)
-        pending_receivables = len([r for r in receivables if r.status == 'pending'])
-        partial_receivables = len([r for r in receivables if r.status == 'partial'])
-        paid_receivables = len([r for r in receivables if r.status == 'paid'])
-        overdue_receivables = len([r for r in receivables if r.is_overdue()])
-        
-        # Financial totals
-        total_amount = sum([float(r.original_amount) for r in receivables])
-        total_pending_amount = sum([float(r.remaining_amount) for r in receivables if r.status != 'paid'])
-        total_paid_amount = sum([float(r.paid_amount) for r in receivables])
-        total_overdue_amount = sum([float(r.remaining_amount) for r in receivables if r.is_overdue()])
-        
-        # Receivables due this week
+        # Grouped in SQL, with money summed in cents: one pass over the
+        # covering (user_id, status, type, ...) index for the totals, and one
+        # GROUP BY ... ORDER BY ... LIMIT for the top customers
         today = date.today()
         week_end = date.fromordinal(today.toordinal() + 7)
-        receivables_due_this_week = len([
-            r for r in receivables 
-            if r.status in ['pending', 'partial'] and today <= r.due_date <= week_end
-        ])
-        
-        # Type breakdown
+        original_cents = cents(Receivable.original_amount)
+        paid_cents = cents(Receivable.paid_amount)
+        remaining_cents = cents(Receivable.remaining_amount)
+        is_unpaid = Receivable.status != 'paid'
+        is_overdue = and_(Receivable.status.notin_(['paid', 'cancelled']), Receivable.due_date < today)
+        
+        groups = db.session.query(
+            Receivable.status,
+            Receivable.type,
+            func.count(),
+            func.sum(original_cents),
+            func.sum(paid_cents),
+            func.sum(remaining_cents),
+            func.sum(case((is_overdue, 1), else_=0)),
+            func.sum(case((is_overdue, remaining_cents), else_=0)),
+            func.sum(case((and_(
+                Receivable.status.in_(['pending', 'partial']),
+                Receivable.due_date.between(today, week_end)
+            ), 1), else_=0))
+        ).filter(Receivable.user_id == current_user_id).group_by(Receivable.status, Receivable.type).all()
+        
+        total_receivables = 0
+        pending_receivables = 0
+        partial_receivables = 0
+        paid_receivables = 0
+        overdue_receivables = 0
+        receivables_due_this_week = 0
+        total_amount = 0
+        total_pending_amount = 0
+        total_paid_amount = 0
+        total_overdue_amount = 0
         types = {}
-        for receivable in receivables:
-            if receivable.type not in types:
-                types[receivable.type] = {
+        
+        for status, receivable_type, count, original, paid, remaining, overdue_count, overdue_amount, due_this_week in groups:
+            total_receivables += count
+            overdue_receivables += overdue_count
+            receivables_due_this_week += due_this_week
+            total_amount += original or 0
+            total_paid_amount += paid or 0
+            total_overdue_amount += overdue_amount or 0
+            if status in RECEIVABLE_PENDING_STATUSES:
+                pending_receivables += count
+            elif status == 'partial':
+                partial_receivables += count
+            elif status == 'paid':
+                paid_receivables += count
+            
+            # Type breakdown
+            if receivable_type not in types:
+                types[receivable_type] = {
                     'count': 0,
                     'total_amount': 0,
                     'pending_amount': 0
                 }
-            types[receivable.type]['count'] += 1
-            types[receivable.type]['total_amount'] += float(receivable.original_amount)
-            if receivable.status != 'paid':
-                types[receivable.type]['pending_amount'] += float(receivable.remaining_amount)
-        
-        # Top customers
-        customers = {}
-        for receivable in receivables:
-            name = receivable.customer_name
-            if name not in customers:
-                customers[name] = {
-                    'name': name,
-                    'total_amount': 0,
-                    'pending_amount': 0,
-                    'count': 0
-                }
-            customers[name]['total_amount'] += float(receivable.original_amount)
-            customers[name]['count'] += 1
-            if receivable.status != 'paid':
-                customers[name]['pending_amount'] += float(receivable.remaining_amount)
-        
-        # Sort customers by total amount
-        top_customers = sorted(customers.values(), key=lambda x: x['total_amount'], reverse=True)[:10]
+            types[receivable_type]['count'] += count
+            types[receivable_type]['total_amount'] += original or 0
+            if status != 'paid':
+                total_pending_amount += remaining or 0
+                types[receivable_type]['pending_amount'] += remaining or 0
+        
+        for type_totals in types.values():
+            type_totals['total_amount'] = from_cents(type_totals['total_amount'])
+            type_totals['pending_amount'] = from_cents(type_totals['pending_amount'])
+        
+        # Top customers, grouped by customer_id, ranked and cut to 10 by the database
+        total_cents = func.sum(original_cents)
+        customer_name = func.coalesce(Customer.name, func.min(Receivable.customer_name))
+        customer_rows = db.session.query(
+            customer_name,
+            total_cents,
+            func.sum(case((is_unpaid, remaining_cents), else_=0)),
+            func.count()
+        ).select_from(Receivable).outerjoin(
+            Customer, Customer.id == Receivable.customer_id
+        ).filter(
+            Receivable.user_id == current_user_id
+        ).group_by(Receivable.customer_id).order_by(
+            total_cents.desc(), customer_name
+        ).limit(TOP_CUSTOMERS_LIMIT).all()
+        
+        top_customers = [{
+            'name': name,
+            'total_amount': from_cents(total or 0),
+            'pending_amount': from_cents(pending or 0),
+            'count': count
+        } for name, total, pending, count in customer_rows]
         
         return jsonify({
             'summary': {
@@ -334,10 +475,10 @@ def get_receivables_summary(user):
                 'paid_receivables': paid_receivables,
                 'overdue_receivables': overdue_receivables,
                 'receivables_due_this_week': receivables_due_this_week,
-                'total_amount': total_amount,
-                'total_pending_amount': total_pending_amount,
-                'total_paid_amount': total_paid_amount,
-                'total_overdue_amount': total_overdue_amount,
+                'total_amount': from_cents(total_amount),
+                'total_pending_amount': from_cents(total_pending_amount),
+                'total_paid_amount': from_cents(total_paid_amount),
+                'total_overdue_amount': from_cents(total_overdue_amount),
                 'types': types,
                 'top_customers': top_customers
             }
@@ -346,21 +487,198 @@ def get_receivables_summary(user):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@receivables_bp.route('/api/receivables/aging', methods=['GET'])
+@basic_auth_required
+@cached_summary
+def get_receivables_aging(user):
+    """Open receivables by days overdue (0-30, 31-60, 61-90, 90+), with the
+    interest accrued so far and late fees, per bucket and per customer.
+    
+    Interest and fees follow Receivable.calculate_total_with_fees(). Not yet
+    due receivables fall in 0-30. Customers are ranked by total owed; send
+    customer_limit (default 50, at most 500) to get more of them.
+    """
+    try:
+        customer_limit = min(max(request.args.get('customer_limit', 50, type=int), 1), AGING_MAX_CUSTOMERS)
+        
+        # Every figure comes out of one GROUP BY customer, bucket over the
+        # open receivables, with the interest worked out per row in SQL
+        today = date.today()
+        days_overdue = func.max(cast(func.julianday(today) - func.julianday(Receivable.due_date), Integer), 0)
+        bucket = case(
+            *[(days_overdue <= last_day, label) for label, last_day in AGING_BUCKETS if last_day is not None],
+            else_=AGING_BUCKETS[-1][0]
+        )
+        remaining_cents = cents(Receivable.remaining_amount)
+        interest_cents = cast(func.round(
+            func.coalesce(Receivable.remaining_amount, 0) * func.coalesce(Receivable.interest_rate, 0)
+            / 3000.0 * days_overdue * 100
+        ), Integer)
+        customer_name = func.coalesce(Customer.name, func.min(Receivable.customer_name))
+        
+        rows = db.session.query(
+            Receivable.customer_id,
+            customer_name,
+            bucket,
+            func.count(),
+            func.sum(remaining_cents),
+            func.sum(case((Receivable.interest_rate > 0, interest_cents), else_=0)),
+            func.sum(cents(func.coalesce(Receivable.late_fee, 0)))
+        ).select_from(Receivable).outerjoin(
+            Customer, Customer.id == Receivable.customer_id
+        ).filter(
+            Receivable.user_id == user.id,
+            Receivable.status.notin_(['paid', 'cancelled'])
+        ).group_by(Receivable.customer_id, bucket).all()
+        
+        def empty_totals():
+            return {'count': 0, 'remaining': 0, 'interest': 0, 'late_fees': 0}
+        
+        def add_totals(totals, count, remaining, interest, late_fees):
+            totals['count'] += count
+            totals['remaining'] += remaining or 0
+            totals['interest'] += interest or 0
+            totals['late_fees'] += late_fees or 0
+        
+        def totals_to_dict(totals):
+            return {
+                'count': totals['count'],
+                'remaining_amount': from_cents(totals['remaining']),
+                'interest': from_cents(totals['interest']),
+                'late_fees': from_cents(totals['late_fees']),
+                'total': from_cents(totals['remaining'] + totals['interest'] + totals['late_fees'])
+            }
+        
+        buckets = {label: empty_totals() for label, _ in AGING_BUCKETS}
+        totals = empty_totals()
+        customers = {}
+        
+        for customer_id, name, label, *values in rows:
+            add_totals(buckets[label], *values)
+            add_totals(totals, *values)
+            if customer_id not in customers:
+                customers[customer_id] = {
+                    'name': name,
+                    'totals': empty_totals(),
+                    'buckets': {bucket_label: empty_totals() for bucket_label, _ in AGING_BUCKETS}
+                }
+            add_totals(customers[customer_id]['totals'], *values)
+            add_totals(customers[customer_id]['buckets'][label], *values)
+        
+        def owed(item):
+            customer_totals = item[1]['totals']
+            return customer_totals['remaining'] + customer_totals['interest'] + customer_totals['late_fees']
+        
+        ranked = sorted(customers.items(), key=lambda item: (-owed(item), item[1]['name'] or ''))
+        
+        return jsonify({
+            'as_of': today.isoformat(),
+            'buckets': {label: totals_to_dict(bucket_totals) for label, bucket_totals in buckets.items()},
+            'totals': totals_to_dict(totals),
+            'customer_count': len(customers),
+            'customers': [{
+                'customer_id': customer_id,
+                'name': customer['name'],
+                **totals_to_dict(customer['totals']),
+                'buckets': {label: totals_to_dict(bucket_totals) for label, bucket_totals in customer['buckets'].items()}
+            } for customer_id, customer in ranked[:customer_limit]]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @receivables_bp.route('/api/customers', methods=['GET'])
 @basic_auth_required
 def get_customers(user):
-    """Get all customers for the authenticated user"""
+    """Page through the user's customers by keyset.
+    
+    Query:
+      cursor: next_cursor of the previous page (omit for the first one)
+      limit: page size, at most 200 (default 50)
+      q: prefix of the name (accent and case insensitive), phone or document
+      sort: name (default) or total_pending, largest first
+      fields: comma-separated customer fields to return (id is always sent)
+      include_total: true to also count the matching customers
+    """
     try:
         current_user_id = user.id
+        limit = min(max(request.args.get('limit', 50, type=int), 1), CUSTOMERS_MAX_LIMIT)
+        
+        sort = request.args.get('sort', 'name')
+        if sort not in CUSTOMER_SORTS:
+            return jsonify({'error': f'sort must be one of: {", ".join(CUSTOMER_SORTS)}'}), 400
+        
+        fields = None
+        if request.args.get('fields'):
+            fields = ['id'] + [field for field in request.args['fields'].split(',') if field and field != 'id']
+            unknown = [field for field in fields if field not in CUSTOMER_FIELDS]
+            if unknown:
+                return jsonify({'error': f'Unknown fields: {", ".join(unknown)}'}), 400
+        
+        query = Customer.query
+        search = request.args.get('q', '').strip()
+        if search:
+            # Each alternative is a range on a (user_id, column) index
+            alternatives = []
+            name_key = normalize_customer_name(search)
+            if name_key:
+                alternatives.append(and_(Customer.user_id == current_user_id, prefix_range(Customer.name_key, name_key)))
+            if any(char.isdigit() for char in search):
+                alternatives.append(and_(Customer.user_id == current_user_id, prefix_range(Customer.phone, search)))
+                alternatives.append(and_(Customer.user_id == current_user_id, prefix_range(Customer.document, search)))
+            query = query.filter(or_(*alternatives) if alternatives else false())
+        else:
+            query = query.filter(Customer.user_id == current_user_id)
+        
+        total_count = None
+        if request.args.get('include_total', 'false').lower() == 'true':
+            total_count = query.count()
+        
+        sort_column, descending = CUSTOMER_SORTS[sort]
+        sort_column = getattr(Customer, sort_column)
+        if descending:
+            query = query.order_by(sort_column.desc(), Customer.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), Customer.id.asc())
+        
+        if request.args.get('cursor'):
+            try:
+                last_value, last_id = decode_cursor(request.args['cursor'])
+            except (ValueError, TypeError):
+                return jsonify({'error': 'Invalid cursor'}), 400
+            
+            position = tuple_(sort_column, Customer.id)
+            query = query.filter(position < (last_value, last_id) if descending else position > (last_value, last_id))
+        
+        # Fetch one extra row to know whether there is a next page
+        customers = query.limit(limit + 1).all()
+        has_more = len(customers) > limit
+        customers = customers[:limit]
+        
+        next_cursor = None
+        if has_more:
+            last = customers[-1]
+            last_value = float(last.total_pending or 0) if sort == 'total_pending' else last.name_key
+            next_cursor = encode_cursor(last_value, last.id)
         
-        customers = Customer.query.filter_by(user_id=current_user_id).all()
         customers_data = [customer.to_dict() for customer in customers]
+        if fields:
+            customers_data = [{field: data[field] for field in fields} for data in customers_data]
         
-        return jsonify({'customers': customers_data}), 200
+        return jsonify({
+            'customers': customers_data,
+            'next_cursor': next_cursor,
+            'has_more': has_more,
+            'total_count': total_count
+        }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def prefix_range(column, prefix):
+    """column starts with prefix, written as a range so SQLite can use an index"""
+    return and_(column >= prefix, column < prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
 @receivables_bp.route('/api/customers', methods=['POST'])
 @basic_auth_required
 def create_customer(user):
@@ -372,9 +690,14 @@ def create_customer(user):
         if 'name' not in data:
             return jsonify({'error': 'name is required'}), 400
         
+        name_key = normalize_customer_name(data['name'])
+        if Customer.query.filter_by(user_id=current_user_id, name_key=name_key).first():
+            return jsonify({'error': 'Customer already exists'}), 409
+        
         customer = Customer(
             user_id=current_user_id,
             name=data['name'],
+            name_key=name_key,
             phone=data.get('phone'),
             email=data.get('email'),
             address=data.get('address'),
@@ -385,6 +708,7 @@ def create_customer(user):
         )
         
         db.session.add(customer)
+        bump_data_version(current_user_id)
         db.session.commit()
         
         return jsonify({
@@ -396,34 +720,72 @@ def create_customer(user):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-def update_customer_record(user_id, customer_name, customer_data):
-    """Update or create customer record"""
+@receivables_bp.route('/api/customers/<int:customer_id>/receivables', methods=['GET'])
+@basic_auth_required
+def get_customer_receivables(user, customer_id):
+    """Customer statement: the customer's totals and receivables by due date.
+    
+    Pages with limit/offset; receivables are read through the customer_id
+    index and their payments with one extra query.
+    """
     try:
-        customer = Customer.query.filter_by(user_id=user_id, name=customer_name).first()
-        
+        customer = Customer.query.filter_by(id=customer_id, user_id=user.id).first()
         if not customer:
-            customer = Customer(
-                user_id=user_id,
-                name=customer_name,
-                phone=customer_data.get('customer_phone'),
-                email=customer_data.get('customer_email'),
-                address=customer_data.get('customer_address')
-            )
-            db.session.add(customer)
-        else:
-            # Update customer info if provided
-            if customer_data.get('customer_phone'):
-                customer.phone = customer_data['customer_phone']
-            if customer_data.get('customer_email'):
-                customer.email = customer_data['customer_email']
-            if customer_data.get('customer_address'):
-                customer.address = customer_data['customer_address']
-        
-        # Update customer statistics
-        customer.update_stats()
-        db.session.commit()
+            return jsonify({'error': 'Customer not found'}), 404
+        
+        limit = request.args.get('limit', 50, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        
+        receivables = Receivable.query.options(selectinload(Receivable.payments)).filter(
+            Receivable.customer_id == customer.id
+        ).order_by(Receivable.due_date.asc(), Receivable.id.asc()).offset(offset).limit(limit + 1).all()
+        
+        return jsonify({
+            'customer': customer.to_dict(),
+            'receivables': [receivable.to_dict() for receivable in receivables[:limit]],
+            'has_more': len(receivables) > limit
+        }), 200
         
     except Exception as e:
-        db.session.rollback()
-        print(f"Error updating customer record: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def update_customer_record(user_id, customer_name, customer_data):
+    """Find the customer by normalized name, creating it if needed, and
+    update its contact info.
+    
+    Runs in the caller's session transaction; the stats are maintained by
+    Customer.add_receivable() and friends. Returns the customer, flushed so
+    it has an id.
+    """
+    name_key = normalize_customer_name(customer_name)
+    customer = Customer.query.filter_by(user_id=user_id, name_key=name_key).first()
+    
+    if not customer:
+        customer = Customer(
+            user_id=user_id,
+            name=customer_name,
+            name_key=name_key,
+            phone=customer_data.get('customer_phone'),
+            email=customer_data.get('customer_email'),
+            address=customer_data.get('customer_address')
+        )
+        db.session.add(customer)
+        db.session.flush()
+    else:
+        # Update customer info if provided
+        if customer_data.get('customer_phone'):
+            customer.phone = customer_data['customer_phone']
+        if customer_data.get('customer_email'):
+            customer.email = customer_data['customer_email']
+        if customer_data.get('customer_address'):
+            customer.address = customer_data['customer_address']
+    
+    return customer
 
+@receivables_bp.cli.command('rebuild-customer-stats')
+@click.option('--user-id', type=int, default=None, help='Only rebuild this user')
+def rebuild_customer_stats_command(user_id):
+    """Recompute customer totals from the receivables table"""
+    Customer.rebuild_stats(user_id)
+    db.session.commit()
+    click.echo('Customer stats rebuilt')
@@ -0,0 +1,68 @@
+from flask import Blueprint, request, jsonify
+from src.models.transaction import Transaction
+from src.models.bill import Bill
+from src.models.receivable import Receivable
+from src.utils.auth import basic_auth_required
+from src.utils.search import SEARCH_SOURCES, search
+
+search_bp = Blueprint('search', __name__)
+
+SEARCH_MODELS = {
+    'transaction': Transaction,
+    'bill': Bill,
+    'receivable': Receivable
+}
+
+SEARCH_MAX_LIMIT = 100
+
+@search_bp.route('/search', methods=['GET'])
+@basic_auth_required
+def search_records(user):
+    """Full-text search over transactions, bills and receivables.
+    
+    Query: q (required), types=transaction,bill,receivable (default all) and
+    limit (default 20, max 100). All words must appear; end a word with * to
+    match it as a prefix. Title matches come first, then the newest records.
+    """
+    try:
+        text = request.args.get('q', '').strip()
+        if not text:
+            return jsonify({'error': 'q is required'}), 400
+        
+        kinds = [kind for kind in request.args.get('types', '').split(',') if kind]
+        unknown = [kind for kind in kinds if kind not in SEARCH_SOURCES]
+        if unknown:
+            return jsonify({'error': f'Unknown types: {", ".join(unknown)}'}), 400
+        
+        limit = min(max(request.args.get('limit', 20, type=int), 1), SEARCH_MAX_LIMIT)
+        hits = search(user.id, text, kinds, limit)
+        
+        # Load the matched records with one query per kind
+        ids_by_kind = {}
+        for kind, ref_id, _, _ in hits:
+            ids_by_kind.setdefault(kind, []).append(ref_id)
+        
+        records = {}
+        for kind, ids in ids_by_kind.items():
+            model = SEARCH_MODELS[kind]
+            for record in model.query.filter(model.user_id == user.id, model.id.in_(ids)):
+                records[(kind, record.id)] = record
+        
+        results = []
+        for kind, ref_id, title, snippet in hits:
+            record = records.get((kind, ref_id))
+            if record is None:
+                continue
+            item = record.to_dict(include_payments=False) if kind == 'receivable' else record.to_dict()
+            results.append({
+                'type': kind,
+                'id': ref_id,
+                'title': title,
+                'snippet': snippet,
+                'item': item
+            })
+        
+        return jsonify({'query': text, 'results': results}), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,8 +1,15 @@
+import io
+import click
 from flask import Blueprint, request, jsonify
-from datetime import datetime
+from datetime import datetime, date, time, timedelta
+from sqlalchemy import func, tuple_
 from src.models.user_simple import db, User
-from src.models.transaction import Transaction, Category
+from src.models.transaction import Transaction, TransactionDailyRollup, Category, to_cents, from_cents
 from src.utils.auth import basic_auth_required
+from src.utils.cache import bump_data_version, cached_summary
+from src.utils.pagination import encode_cursor, decode_cursor
+from src.utils.export import EXPORT_FORMATS, stream_export
+from src.utils.importers import iter_csv_rows, iter_ofx_rows, parse_amount, parse_date
 
 transactions_bp = Blueprint('transactions', __name__)
 
@@ -15,6 +22,34 @@ CARD_FEES = {
     'boleto': 0.02     # 2%
 }
 
+# Bulk import tuning: rows per executemany and rows per commit
+IMPORT_BATCH_SIZE = 5000
+IMPORT_COMMIT_SIZE = 100000
+IMPORT_MAX_REPORTED_ERRORS = 100
+IMPORT_COLUMNS = (
+    'user_id', 'type', 'amount', 'description', 'category', 'payment_method',
+    'card_fee', 'net_amount', 'date', 'notes', 'created_at', 'updated_at'
+)
+
+# Upper bound for POST /transactions/batch
+BATCH_MAX_OPERATIONS = 500
+
+def calculate_card_fee_cents(amount_cents, payment_method):
+    """Return (card_fee_cents, net_amount_cents), rounding the fee half up to the cent"""
+    card_fee_cents = 0
+    method = (payment_method or '').lower()
+    
+    if method in CARD_FEES:
+        rate_basis_points = round(CARD_FEES[method] * 10000)
+        card_fee_cents = (amount_cents * rate_basis_points + 5000) // 10000
+    
+    return card_fee_cents, amount_cents - card_fee_cents
+
+def calculate_card_fee(amount, payment_method):
+    """Return (card_fee, net_amount) for an amount paid with payment_method"""
+    card_fee_cents, net_amount_cents = calculate_card_fee_cents(to_cents(amount), payment_method)
+    return from_cents(card_fee_cents), from_cents(net_amount_cents)
+
 @transactions_bp.route('/transactions', methods=['GET'])
 @basic_auth_required
 def get_transactions(user):
@@ -22,22 +57,12 @@ def get_transactions(user):
         user_id = user.id
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
-        transaction_type = request.args.get('type')  # 'income' or 'expense'
-        category = request.args.get('category')
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
         
-        query = Transaction.query.filter_by(user_id=user_id)
+        query = build_transactions_query(user_id, request.args)
         
-        # Apply filters
-        if transaction_type:
-            query = query.filter_by(type=transaction_type)
-        if category:
-            query = query.filter_by(category=category)
-        if start_date:
-            query = query.filter(Transaction.date >= datetime.fromisoformat(start_date))
-        if end_date:
-            query = query.filter(Transaction.date <= datetime.fromisoformat(end_date))
+        # Keyset mode: seek on (date, id) instead of COUNT + OFFSET
+        if 'cursor' in request.args:
+            return get_transactions_page_after(query, request.args.get('cursor'), per_page)
         
         # Order by date (most recent first)
         query = query.order_by(Transaction.date.desc())
@@ -58,6 +83,85 @@ def get_transactions(user):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def build_transactions_query(user_id, args):
+    """Build the filtered transaction query shared by the list and export endpoints"""
+    transaction_type = args.get('type')  # 'income' or 'expense'
+    category = args.get('category')
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    
+    query = Transaction.query.filter_by(user_id=user_id)
+    
+    # Apply filters
+    if transaction_type:
+        query = query.filter_by(type=transaction_type)
+    if category:
+        query = query.filter_by(category=category)
+    if start_date:
+        query = query.filter(Transaction.date >= datetime.fromisoformat(start_date))
+    if end_date:
+        query = query.filter(Transaction.date <= datetime.fromisoformat(end_date))
+    
+    return query
+
+def get_transactions_page_after(query, cursor, per_page):
+    """Return the page of transactions that follows the given cursor.
+    
+    An empty cursor returns the first page. The total is only counted when
+    include_total=true, since it is the one part that grows with the history.
+    """
+    total = None
+    if request.args.get('include_total', 'false').lower() == 'true':
+        total = query.order_by(None).count()
+    
+    query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+    
+    if cursor:
+        try:
+            last_date, last_id = decode_cursor(cursor)
+            last_date = datetime.fromisoformat(last_date)
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        query = query.filter(
+            tuple_(Transaction.date, Transaction.id) < (last_date, last_id)
+        )
+    
+    # Fetch one extra row to know whether there is a next page
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    transactions = rows[:per_page]
+    
+    next_cursor = None
+    if has_more:
+        last = transactions[-1]
+        next_cursor = encode_cursor(last.date.isoformat(), last.id)
+    
+    return jsonify({
+        'transactions': [t.to_dict() for t in transactions],
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+        'total': total,
+        'per_page': per_page
+    }), 200
+
+@transactions_bp.route('/transactions/export', methods=['GET'])
+@basic_auth_required
+def export_transactions(user):
+    """Stream the filtered transactions as CSV or NDJSON"""
+    try:
+        file_format = request.args.get('format', 'csv').lower()
+        if file_format not in EXPORT_FORMATS:
+            return jsonify({'error': 'Unsupported format. Use csv or ndjson'}), 400
+        
+        query = build_transactions_query(user.id, request.args)
+        query = query.order_by(Transaction.date.asc(), Transaction.id.asc())
+        
+        return stream_export(query, Transaction.to_dict, file_format, 'transactions')
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @transactions_bp.route('/transactions', methods=['POST'])
 @basic_auth_required
 def create_transaction(user):
@@ -65,56 +169,251 @@ def create_transaction(user):
         user_id = user.id
         data = request.get_json()
         
-        # Validate required fields
-        required_fields = ['type', 'amount', 'description', 'category']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        transaction = add_transaction(user_id, data)
+        bump_data_version(user_id)
+        db.session.commit()
         
-        # Calculate card fee and net amount
-        amount = float(data['amount'])
-        payment_method = data.get('payment_method', '').lower()
-        card_fee = 0.0
+        return jsonify({
+            'message': 'Transaction created successfully',
+            'transaction': transaction.to_dict()
+        }), 201
         
-        if payment_method in CARD_FEES:
-            card_fee = amount * CARD_FEES[payment_method]
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def parse_transaction_date(value):
+    """Parse an ISO date from the API, returning None when it is not valid"""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+def add_transaction(user_id, data):
+    """Validate data and add a new transaction to the session, with its rollup"""
+    # Validate required fields
+    required_fields = ['type', 'amount', 'description', 'category']
+    for field in required_fields:
+        if field not in data:
+            raise ValueError(f'Missing required field: {field}')
+    
+    # Calculate card fee and net amount
+    amount = float(data['amount'])
+    card_fee, net_amount = calculate_card_fee(amount, data.get('payment_method'))
+    
+    # Parse date
+    transaction_date = None
+    if 'date' in data and data['date']:
+        transaction_date = parse_transaction_date(data['date'])
+    
+    # Create transaction
+    transaction = Transaction(
+        user_id=user_id,
+        type=data['type'],
+        amount=amount,
+        description=data['description'],
+        category=data['category'],
+        payment_method=data.get('payment_method'),
+        card_fee=card_fee,
+        net_amount=net_amount,
+        date=transaction_date or datetime.utcnow(),
+        notes=data.get('notes')
+    )
+    
+    db.session.add(transaction)
+    TransactionDailyRollup.add(transaction)
+    
+    return transaction
+
+def change_transaction(transaction, data):
+    """Apply the updatable fields in data to a transaction and move it in the rollup"""
+    # Parse before touching anything, so a bad amount leaves the row unchanged
+    amount = float(data['amount']) if 'amount' in data else None
+    if amount is not None:
+        card_fee, net_amount = calculate_card_fee(
+            amount, data.get('payment_method', transaction.payment_method)
+        )
+    
+    # Take the old values out of the rollup before changing them
+    TransactionDailyRollup.remove(transaction)
+    
+    # Update fields
+    if amount is not None:
+        transaction.amount = amount
+        transaction.card_fee = card_fee
+        transaction.net_amount = net_amount
+    
+    if 'description' in data:
+        transaction.description = data['description']
+    if 'category' in data:
+        transaction.category = data['category']
+    if 'payment_method' in data:
+        transaction.payment_method = data['payment_method']
+    if 'notes' in data:
+        transaction.notes = data['notes']
+    if 'date' in data and data['date']:
+        transaction.date = parse_transaction_date(data['date']) or transaction.date
+    
+    transaction.updated_at = datetime.utcnow()
+    TransactionDailyRollup.add(transaction)
+
+def remove_transaction(transaction):
+    """Delete a transaction from the session and take it out of the rollup"""
+    TransactionDailyRollup.remove(transaction)
+    db.session.delete(transaction)
+
+@transactions_bp.route('/transactions/import', methods=['POST'])
+@basic_auth_required
+def import_transactions(user):
+    """Import a CSV or OFX file of transactions.
+    
+    The upload is parsed as a stream and inserted with a plain DBAPI
+    executemany in batches of IMPORT_BATCH_SIZE, committing every
+    IMPORT_COMMIT_SIZE rows. Invalid rows are skipped and reported; valid
+    rows are still imported.
+    """
+    try:
+        user_id = user.id
+        upload = request.files.get('file')
+        if not upload:
+            return jsonify({'error': 'file is required'}), 400
         
-        net_amount = amount - card_fee
+        file_format = (request.form.get('format') or upload.filename.rsplit('.', 1)[-1]).lower()
+        if file_format not in ('csv', 'ofx'):
+            return jsonify({'error': 'Unsupported format. Use csv or ofx'}), 400
         
-        # Parse date
-        transaction_date = datetime.utcnow()
-        if 'date' in data and data['date']:
-            try:
-                transaction_date = datetime.fromisoformat(data['date'].replace('Z', '+00:00'))
-            except:
-                pass
+        # Defaults for columns the file does not carry (OFX has no category)
+        default_category = request.form.get('category', 'Importado')
+        default_payment_method = request.form.get('payment_method')
         
-        # Create transaction
-        transaction = Transaction(
-            user_id=user_id,
-            type=data['type'],
-            amount=amount,
-            description=data['description'],
-            category=data['category'],
-            payment_method=data.get('payment_method'),
-            card_fee=card_fee,
-            net_amount=net_amount,
-            date=transaction_date,
-            notes=data.get('notes')
-        )
+        text_stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', errors='replace', newline='')
+        rows = iter_ofx_rows(text_stream) if file_format == 'ofx' else iter_csv_rows(text_stream)
         
-        db.session.add(transaction)
+        # Bypass per-row ORM and parameter processing: rows are built as tuples
+        # and only the date column goes through the column type's converter
+        insert_sql = 'INSERT INTO transactions ({}) VALUES ({})'.format(
+            ', '.join(IMPORT_COLUMNS), ', '.join('?' for _ in IMPORT_COLUMNS)
+        )
+        dialect = db.engine.dialect
+        to_db_datetime = Transaction.__table__.c.date.type.dialect_impl(dialect).bind_processor(dialect)
+        now = to_db_datetime(datetime.utcnow())
+        
+        batch = []
+        rollup = {}
+        imported = 0
+        uncommitted = 0
+        error_count = 0
+        errors = []
+        
+        for row_number, row in rows:
+            try:
+                batch.append(build_import_values(
+                    user_id, row, default_category, default_payment_method, now, to_db_datetime
+                ))
+            except ValueError as e:
+                error_count += 1
+                if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+                    errors.append({'row': row_number, 'error': str(e)})
+                continue
+            
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                db.session.connection().exec_driver_sql(insert_sql, batch)
+                accumulate_import_rollup(rollup, batch)
+                imported += len(batch)
+                uncommitted += len(batch)
+                batch = []
+                
+                if uncommitted >= IMPORT_COMMIT_SIZE:
+                    flush_import_rollup(user_id, rollup)
+                    bump_data_version(user_id)
+                    db.session.commit()
+                    uncommitted = 0
+        
+        if batch:
+            db.session.connection().exec_driver_sql(insert_sql, batch)
+            accumulate_import_rollup(rollup, batch)
+            imported += len(batch)
+        flush_import_rollup(user_id, rollup)
+        bump_data_version(user_id)
         db.session.commit()
         
         return jsonify({
-            'message': 'Transaction created successfully',
-            'transaction': transaction.to_dict()
-        }), 201
+            'message': 'Import finished',
+            'imported': imported,
+            'failed': error_count,
+            'errors': errors
+        }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def build_import_values(user_id, row, default_category, default_payment_method, now, to_db_datetime):
+    """Validate one imported row and return its values in IMPORT_COLUMNS order"""
+    for field in ('type', 'amount', 'description'):
+        if not row.get(field):
+            raise ValueError(f'Missing required field: {field}')
+    
+    transaction_type = row['type'].strip().lower()
+    if transaction_type not in ('income', 'expense'):
+        raise ValueError(f'Invalid type: {row["type"]}')
+    
+    # Money columns are INTEGER cents; this raw insert bypasses the Cents type
+    amount_cents = to_cents(parse_amount(row['amount']))
+    payment_method = row.get('payment_method') or default_payment_method
+    card_fee_cents, net_amount_cents = calculate_card_fee_cents(amount_cents, payment_method)
+    
+    return (
+        user_id,
+        transaction_type,
+        amount_cents,
+        row['description'].strip()[:255],
+        row.get('category') or default_category,
+        payment_method,
+        card_fee_cents,
+        net_amount_cents,
+        to_db_datetime(parse_date(row['date'])) if row.get('date') else now,
+        row.get('notes') or None,
+        now,
+        now
+    )
+
+def accumulate_import_rollup(rollup, batch):
+    """Sum a batch of imported rows into per-day rollup groups"""
+    for values in batch:
+        _, t_type, amount_cents, _, category, method, card_fee_cents, net_amount_cents, db_date = values[:9]
+        key = (db_date[:10], t_type, category, method or '')
+        
+        group = rollup.get(key)
+        if group is None:
+            group = rollup[key] = [0, 0, 0, 0]
+        group[0] += amount_cents
+        group[1] += net_amount_cents
+        group[2] += card_fee_cents
+        group[3] += 1
+
+def flush_import_rollup(user_id, rollup):
+    """Apply the accumulated import groups to the daily rollup and reset them"""
+    TransactionDailyRollup.apply_deltas([
+        {
+            'user_id': user_id,
+            'day': date.fromisoformat(day),
+            'type': t_type,
+            'category': category,
+            'payment_method': method,
+            'amount_cents': amount_cents,
+            'net_amount_cents': net_amount_cents,
+            'card_fee_cents': card_fee_cents,
+            'transaction_count': count
+        }
+        for (day, t_type, category, method), (amount_cents, net_amount_cents, card_fee_cents, count)
+        in rollup.items()
+    ])
+    rollup.clear()
+
 @transactions_bp.route('/transactions/<int:transaction_id>', methods=['GET'])
 @basic_auth_required
 def get_transaction(user, transaction_id):
@@ -146,34 +445,8 @@ def update_transaction(user, transaction_id):
         
         data = request.get_json()
         
-        # Update fields
-        if 'amount' in data:
-            amount = float(data['amount'])
-            payment_method = data.get('payment_method', transaction.payment_method or '').lower()
-            card_fee = 0.0
-            
-            if payment_method in CARD_FEES:
-                card_fee = amount * CARD_FEES[payment_method]
-            
-            transaction.amount = amount
-            transaction.card_fee = card_fee
-            transaction.net_amount = amount - card_fee
-        
-        if 'description' in data:
-            transaction.description = data['description']
-        if 'category' in data:
-            transaction.category = data['category']
-        if 'payment_method' in data:
-            transaction.payment_method = data['payment_method']
-        if 'notes' in data:
-            transaction.notes = data['notes']
-        if 'date' in data and data['date']:
-            try:
-                transaction.date = datetime.fromisoformat(data['date'].replace('Z', '+00:00'))
-            except:
-                pass
-        
-        transaction.updated_at = datetime.utcnow()
+        change_transaction(transaction, data)
+        bump_data_version(user_id)
         db.session.commit()
         
         return jsonify({
@@ -181,6 +454,9 @@ def update_transaction(user, transaction_id):
             'transaction': transaction.to_dict()
         }), 200
         
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -197,7 +473,8 @@ def delete_transaction(user, transaction_id):
         if not transaction:
             return jsonify({'error': 'Transaction not found'}), 404
         
-        db.session.delete(transaction)
+        remove_transaction(transaction)
+        bump_data_version(user_id)
         db.session.commit()
         
         return jsonify({'message': 'Transaction deleted successfully'}), 200
@@ -206,6 +483,99 @@ def delete_transaction(user, transaction_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@transactions_bp.route('/transactions/batch', methods=['POST'])
+@basic_auth_required
+def batch_transactions(user):
+    """Apply a list of create/update/delete operations in one database transaction.
+    
+    Body: {"operations": [{"op": "create", "data": {...}},
+                          {"op": "update", "id": 1, "data": {...}},
+                          {"op": "delete", "id": 2}]}
+    
+    Operations that fail validation are reported and skipped; the rest are
+    committed together with a single commit.
+    """
+    try:
+        user_id = user.id
+        data = request.get_json() or {}
+        operations = data.get('operations')
+        
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'error': 'operations must be a non-empty list'}), 400
+        if len(operations) > BATCH_MAX_OPERATIONS:
+            return jsonify({'error': f'At most {BATCH_MAX_OPERATIONS} operations per batch'}), 400
+        
+        # Load every transaction referenced by an update or delete in one query
+        ids = {
+            operation.get('id') for operation in operations
+            if isinstance(operation, dict) and operation.get('op') in ('update', 'delete')
+            and isinstance(operation.get('id'), int)
+        }
+        existing = {}
+        if ids:
+            existing = {
+                t.id: t for t in Transaction.query.filter(
+                    Transaction.user_id == user_id, Transaction.id.in_(ids)
+                )
+            }
+        
+        results = []
+        touched = []
+        
+        for index, operation in enumerate(operations):
+            op = operation.get('op') if isinstance(operation, dict) else None
+            result = {'index': index, 'op': op}
+            results.append(result)
+            
+            op_data = (operation.get('data') or {}) if isinstance(operation, dict) else None
+            
+            try:
+                if op in ('create', 'update') and not isinstance(op_data, dict):
+                    result.update({'status': 400, 'error': 'data must be an object'})
+                elif op in ('update', 'delete') and not isinstance(operation.get('id'), int):
+                    result.update({'status': 400, 'error': 'id must be an integer'})
+                elif op == 'create':
+                    transaction = add_transaction(user_id, op_data)
+                    result['status'] = 201
+                    touched.append((result, transaction))
+                elif op in ('update', 'delete'):
+                    transaction = existing.get(operation.get('id'))
+                    if transaction is None:
+                        result.update({'status': 404, 'error': 'Transaction not found'})
+                    elif op == 'update':
+                        change_transaction(transaction, op_data)
+                        result['status'] = 200
+                        touched.append((result, transaction))
+                    else:
+                        remove_transaction(transaction)
+                        del existing[transaction.id]
+                        result.update({'status': 200, 'id': transaction.id})
+                else:
+                    result.update({'status': 400, 'error': 'op must be create, update or delete'})
+            except (ValueError, TypeError) as e:
+                # e.g. "amount": null; both helpers parse before changing anything
+                result.update({'status': 400, 'error': str(e)})
+        
+        # Flush once to assign ids, and serialize before the commit expires the rows
+        db.session.flush()
+        for result, transaction in touched:
+            result['transaction'] = transaction.to_dict()
+        
+        succeeded = sum(1 for result in results if result['status'] < 400)
+        if succeeded:
+            bump_data_version(user_id)
+        db.session.commit()
+        
+        return jsonify({
+            'results': results,
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @transactions_bp.route('/categories', methods=['GET'])
 @basic_auth_required
 def get_categories(user):
@@ -256,6 +626,7 @@ def create_category(user):
         )
         
         db.session.add(category)
+        bump_data_version(user_id)
         db.session.commit()
         
         return jsonify({
@@ -267,55 +638,149 @@ def create_category(user):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def split_period(start=None, end=None):
+    """Split the range start <= date <= end into the whole days served by the
+    daily rollup and the partial days that must be read from transactions.
+    
+    Returns (rollup_days, raw_ranges): rollup_days is a (first_day, last_day)
+    pair (either bound may be None) or None when no whole day is covered, and
+    raw_ranges is a list of (start, end, end_inclusive) datetime ranges.
+    """
+    first_day = None
+    if start is not None:
+        first_day = start.date() if start.time() == time.min else start.date() + timedelta(days=1)
+    last_day = end.date() - timedelta(days=1) if end is not None else None
+    
+    # Range shorter than a whole day: nothing to take from the rollup
+    if first_day is not None and last_day is not None and first_day > last_day:
+        return None, [(start, end, True)]
+    
+    raw_ranges = []
+    if start is not None and first_day != start.date():
+        raw_ranges.append((start, datetime.combine(first_day, time.min), False))
+    if end is not None:
+        raw_ranges.append((datetime.combine(end.date(), time.min), end, True))
+    
+    return (first_day, last_day), raw_ranges
+
+def get_period_groups(user_id, start=None, end=None):
+    """Return (type, category, payment_method, count, net_amount_cents, card_fee_cents)
+    groups for the transactions with start <= date <= end.
+    
+    Whole days are read from the daily rollup; only the partial days at the
+    edges of the range are aggregated from the transactions table.
+    """
+    rollup_days, raw_ranges = split_period(start, end)
+    groups = get_rollup_period_groups(user_id, *rollup_days) if rollup_days else []
+    for range_start, range_end, end_inclusive in raw_ranges:
+        groups += get_raw_period_groups(user_id, range_start, range_end, end_inclusive)
+    
+    return groups
+
+def get_rollup_period_groups(user_id, first_day=None, last_day=None):
+    """Sum the daily rollup over [first_day, last_day]"""
+    query = db.session.query(
+        TransactionDailyRollup.type,
+        TransactionDailyRollup.category,
+        TransactionDailyRollup.payment_method,
+        func.sum(TransactionDailyRollup.transaction_count),
+        func.sum(TransactionDailyRollup.net_amount_cents),
+        func.sum(TransactionDailyRollup.card_fee_cents)
+    ).filter(TransactionDailyRollup.user_id == user_id)
+    
+    if first_day is not None:
+        query = query.filter(TransactionDailyRollup.day >= first_day)
+    if last_day is not None:
+        query = query.filter(TransactionDailyRollup.day <= last_day)
+    
+    return query.group_by(
+        TransactionDailyRollup.type,
+        TransactionDailyRollup.category,
+        TransactionDailyRollup.payment_method
+    ).all()
+
+def get_raw_period_groups(user_id, start=None, end=None, end_inclusive=True):
+    """Aggregate transactions in a datetime range straight from the transactions table"""
+    query = db.session.query(
+        Transaction.type,
+        Transaction.category,
+        Transaction.payment_method,
+        func.count(Transaction.id),
+        func.coalesce(func.sum(db.type_coerce(Transaction.net_amount, db.Integer)), 0),
+        func.coalesce(func.sum(db.type_coerce(Transaction.card_fee, db.Integer)), 0)
+    ).filter(Transaction.user_id == user_id)
+    
+    if start is not None:
+        query = query.filter(Transaction.date >= start)
+    if end is not None:
+        query = query.filter(Transaction.date <= end if end_inclusive else Transaction.date < end)
+    
+    return query.group_by(
+        Transaction.type, Transaction.category, Transaction.payment_method
+    ).all()
+
 @transactions_bp.route('/dashboard/summary', methods=['GET'])
 @basic_auth_required
+@cached_summary
 def get_dashboard_summary(user):
     try:
         user_id = user.id
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        query = Transaction.query.filter_by(user_id=user_id)
-        
-        if start_date:
-            query = query.filter(Transaction.date >= datetime.fromisoformat(start_date))
-        if end_date:
-            query = query.filter(Transaction.date <= datetime.fromisoformat(end_date))
-        
-        transactions = query.all()
-        
-        # Calculate summary
-        total_income = sum(t.net_amount for t in transactions if t.type == 'income')
-        total_expenses = sum(t.net_amount for t in transactions if t.type == 'expense')
-        total_fees = sum(t.card_fee for t in transactions)
-        net_profit = total_income - total_expenses
+        # Aggregate in SQL: one row per (type, category, payment_method) group,
+        # summed here in integer cents and converted to reais at the end
+        groups = get_period_groups(
+            user_id,
+            datetime.fromisoformat(start_date) if start_date else None,
+            datetime.fromisoformat(end_date) if end_date else None
+        )
         
-        # Payment method breakdown
+        total_income = 0
+        total_expenses = 0
+        total_fees = 0
+        transaction_count = 0
         payment_methods = {}
-        for t in transactions:
-            if t.payment_method:
-                method = t.payment_method
+        categories = {}
+        
+        for t_type, category, method, count, net_amount, card_fee in groups:
+            if t_type == 'income':
+                total_income += net_amount
+            elif t_type == 'expense':
+                total_expenses += net_amount
+            total_fees += card_fee
+            transaction_count += count
+            
+            # Payment method breakdown
+            if method:
                 if method not in payment_methods:
                     payment_methods[method] = {'amount': 0, 'count': 0, 'fees': 0}
-                payment_methods[method]['amount'] += t.net_amount
-                payment_methods[method]['count'] += 1
-                payment_methods[method]['fees'] += t.card_fee
+                payment_methods[method]['amount'] += net_amount
+                payment_methods[method]['count'] += count
+                payment_methods[method]['fees'] += card_fee
+            
+            # Category breakdown
+            if category not in categories:
+                categories[category] = {'income': 0, 'expense': 0, 'count': 0}
+            categories[category][t_type] = categories[category].get(t_type, 0) + net_amount
+            categories[category]['count'] += count
         
-        # Category breakdown
-        categories = {}
-        for t in transactions:
-            if t.category not in categories:
-                categories[t.category] = {'income': 0, 'expense': 0, 'count': 0}
-            categories[t.category][t.type] += t.net_amount
-            categories[t.category]['count'] += 1
+        net_profit = total_income - total_expenses
+        
+        for method_totals in payment_methods.values():
+            method_totals['amount'] = from_cents(method_totals['amount'])
+            method_totals['fees'] = from_cents(method_totals['fees'])
+        for category_totals in categories.values():
+            category_totals['income'] = from_cents(category_totals['income'])
+            category_totals['expense'] = from_cents(category_totals['expense'])
         
         return jsonify({
             'summary': {
-                'total_income': total_income,
-                'total_expenses': total_expenses,
-                'net_profit': net_profit,
-                'total_fees': total_fees,
-                'transaction_count': len(transactions)
+                'total_income': from_cents(total_income),
+                'total_expenses': from_cents(total_expenses),
+                'net_profit': from_cents(net_profit),
+                'total_fees': from_cents(total_fees),
+                'transaction_count': transaction_count
             },
             'payment_methods': payment_methods,
             'categories': categories
@@ -324,3 +789,122 @@ def get_dashboard_summary(user):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Bucket expressions for /dashboard/timeseries, keyed by interval. Each maps a
+# date/datetime column to the first day of its bucket as 'YYYY-MM-DD'
+# (weeks are ISO weeks, starting on Monday).
+TIMESERIES_BUCKETS = {
+    'day': lambda column: func.date(column),
+    'week': lambda column: func.date(column, '-6 days', 'weekday 1'),
+    'month': lambda column: func.strftime('%Y-%m-01', column)
+}
+
+def get_period_buckets(user_id, start, end, interval):
+    """Return (bucket, type, count, net_amount_cents, card_fee_cents) groups for
+    the transactions with start <= date <= end, bucketed by interval.
+    
+    Like get_period_groups, whole days come from the daily rollup and only the
+    partial days at the edges are read from the transactions table.
+    """
+    bucket_of = TIMESERIES_BUCKETS[interval]
+    rollup_days, raw_ranges = split_period(start, end)
+    groups = []
+    
+    if rollup_days:
+        first_day, last_day = rollup_days
+        bucket = bucket_of(TransactionDailyRollup.day)
+        query = db.session.query(
+            bucket,
+            TransactionDailyRollup.type,
+            func.sum(TransactionDailyRollup.transaction_count),
+            func.sum(TransactionDailyRollup.net_amount_cents),
+            func.sum(TransactionDailyRollup.card_fee_cents)
+        ).filter(TransactionDailyRollup.user_id == user_id)
+        if first_day is not None:
+            query = query.filter(TransactionDailyRollup.day >= first_day)
+        if last_day is not None:
+            query = query.filter(TransactionDailyRollup.day <= last_day)
+        groups += query.group_by(bucket, TransactionDailyRollup.type).all()
+    
+    bucket = bucket_of(Transaction.date)
+    for range_start, range_end, end_inclusive in raw_ranges:
+        groups += db.session.query(
+            bucket,
+            Transaction.type,
+            func.count(Transaction.id),
+            func.coalesce(func.sum(db.type_coerce(Transaction.net_amount, db.Integer)), 0),
+            func.coalesce(func.sum(db.type_coerce(Transaction.card_fee, db.Integer)), 0)
+        ).filter(
+            Transaction.user_id == user_id,
+            Transaction.date >= range_start,
+            Transaction.date <= range_end if end_inclusive else Transaction.date < range_end
+        ).group_by(bucket, Transaction.type).all()
+    
+    return groups
+
+@transactions_bp.route('/dashboard/timeseries', methods=['GET'])
+@basic_auth_required
+@cached_summary
+def get_dashboard_timeseries(user):
+    """Income, expenses, fees and net per day, ISO week or month.
+    
+    Query: start_date and end_date (ISO, required, same semantics as
+    /dashboard/summary) and interval=day|week|month (default day). Only
+    buckets that contain transactions are returned, oldest first.
+    """
+    try:
+        interval = request.args.get('interval', 'day')
+        if interval not in TIMESERIES_BUCKETS:
+            return jsonify({'error': f'interval must be one of: {", ".join(TIMESERIES_BUCKETS)}'}), 400
+        
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        if not start_date or not end_date:
+            return jsonify({'error': 'start_date and end_date are required'}), 400
+        
+        try:
+            start = datetime.fromisoformat(start_date)
+            end = datetime.fromisoformat(end_date)
+        except ValueError:
+            return jsonify({'error': 'Invalid date format'}), 400
+        
+        buckets = {}
+        for period, t_type, count, net_amount, card_fee in get_period_buckets(user.id, start, end, interval):
+            if period not in buckets:
+                buckets[period] = {'income': 0, 'expenses': 0, 'fees': 0, 'transaction_count': 0}
+            totals = buckets[period]
+            if t_type == 'income':
+                totals['income'] += net_amount
+            elif t_type == 'expense':
+                totals['expenses'] += net_amount
+            totals['fees'] += card_fee
+            totals['transaction_count'] += count
+        
+        series = []
+        for period in sorted(buckets):
+            totals = buckets[period]
+            series.append({
+                'period': period,
+                'income': from_cents(totals['income']),
+                'expenses': from_cents(totals['expenses']),
+                'fees': from_cents(totals['fees']),
+                'net': from_cents(totals['income'] - totals['expenses']),
+                'transaction_count': totals['transaction_count']
+            })
+        
+        return jsonify({
+            'interval': interval,
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+            'series': series
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@transactions_bp.cli.command('rebuild-rollups')
+@click.option('--user-id', type=int, default=None, help='Only rebuild this user')
+def rebuild_rollups_command(user_id):
+    """Rebuild the daily transaction rollup from the transactions table"""
+    TransactionDailyRollup.rebuild(user_id)
+    db.session.commit()
+    click.echo('Transaction rollups rebuilt')
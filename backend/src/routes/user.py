@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request
 from src.models.user_simple import User, db
+from src.utils.auth import forget_user_credentials
 
 user_bp = Blueprint('user', __name__)
 
@@ -29,6 +30,7 @@ def update_user(user_id):
     user.username = data.get('username', user.username)
     user.email = data.get('email', user.email)
     db.session.commit()
+    forget_user_credentials(user.id)
     return jsonify(user.to_dict())
 
 @user_bp.route('/users/<int:user_id>', methods=['DELETE'])
@@ -36,4 +38,5 @@ def delete_user(user_id):
     user = User.query.get_or_404(user_id)
     db.session.delete(user)
     db.session.commit()
+    forget_user_credentials(user_id)
     return '', 204
@@ -1,30 +1,166 @@
 import base64
+import hashlib
+import hmac
+import secrets
 from functools import wraps
-from flask import request, jsonify
-from src.models.user_simple import User
+from flask import current_app, request, jsonify
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+from sqlalchemy.orm import make_transient_to_detached
+from src.models.user_simple import db, User
+from src.utils.cache import LRUCache
+
+# Verified credentials are remembered for AUTH_CACHE_TTL seconds, so repeated
+# requests skip the user lookup and the password check
+AUTH_CACHE_TTL = 300
+AUTH_CACHE_SIZE = 4096
+
+# Cache keys are HMACs of the Authorization header under a per-process key, so
+# the cache never holds the credentials themselves
+_credential_key = secrets.token_bytes(32)
+credential_cache = LRUCache(AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+
+# Signed session tokens: lifetime in seconds, and the users they resolve to,
+# cached by id so a valid token needs no database round trip
+AUTH_TOKEN_TTL = 12 * 60 * 60
+AUTH_TOKEN_SALT = 'auth-token'
+token_user_cache = LRUCache(AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+_token_serializers = {}
+
+def credential_digest(auth_header):
+    return hmac.new(_credential_key, auth_header.encode('utf-8'), hashlib.sha256).digest()
+
+def detached_copy(user):
+    """Copy the loaded columns of user into a detached User that can be cached
+    and attached to later sessions with merge(load=False), without a query
+    """
+    snapshot = User(**{
+        attribute.key: getattr(user, attribute.key)
+        for attribute in User.__mapper__.column_attrs
+    })
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+def authenticate_basic(auth_header):
+    """Return the User for a Basic Authorization header, or None when the
+    credentials do not match. Raises ValueError for a malformed header.
+    
+    The returned user may be inactive; callers decide how to reject it.
+    """
+    digest = credential_digest(auth_header)
+    snapshot = credential_cache.get(digest)
+    if snapshot is not None:
+        return db.session.merge(snapshot, load=False)
+    
+    # Extract and decode credentials
+    encoded_credentials = auth_header.split(' ')[1]
+    decoded_credentials = base64.b64decode(encoded_credentials).decode('utf-8')
+    username, password = decoded_credentials.split(':', 1)
+    
+    # Find user by username or email
+    user = User.query.filter(
+        (User.username == username) |
+        (User.email == username.lower())
+    ).first()
+    
+    if not user or not user.check_password(password):
+        return None
+    
+    credential_cache.set(digest, detached_copy(user))
+    return user
+
+def forget_user_credentials(user_id):
+    """Drop cached credentials of a user whose password, login names, active
+    flag, token version or existence changed. Call after the change is
+    committed.
+    """
+    credential_cache.remove_if(lambda snapshot: snapshot.id == user_id)
+    token_user_cache.remove_if(lambda snapshot: snapshot.id == user_id)
+
+def token_serializer():
+    """HMAC-SHA256 timed serializer keyed by the app's SECRET_KEY"""
+    secret_key = current_app.config['SECRET_KEY']
+    serializer = _token_serializers.get(secret_key)
+    if serializer is None:
+        serializer = URLSafeTimedSerializer(
+            secret_key,
+            salt=AUTH_TOKEN_SALT,
+            signer_kwargs={'digest_method': hashlib.sha256}
+        )
+        _token_serializers[secret_key] = serializer
+    return serializer
+
+def issue_token(user):
+    """Return a signed token for user that expires after AUTH_TOKEN_TTL.
+    
+    It carries the user id and token version, so bumping the user's
+    token_version revokes every token issued before.
+    """
+    return token_serializer().dumps([user.id, user.token_version or 0])
+
+def authenticate_token(token):
+    """Return the active User for a session token, or None when the token is
+    invalid, expired, revoked or belongs to a deactivated user.
+    
+    Only the signature is checked per request; the user row is read once and
+    kept in token_user_cache like verified Basic credentials.
+    """
+    try:
+        user_id, token_version = token_serializer().loads(token, max_age=AUTH_TOKEN_TTL)
+    except (BadSignature, SignatureExpired, TypeError, ValueError):
+        return None
+    
+    snapshot = token_user_cache.get(user_id)
+    if snapshot is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = detached_copy(user)
+        token_user_cache.set(user_id, snapshot)
+    
+    if (snapshot.token_version or 0) != token_version or not snapshot.is_active:
+        return None
+    
+    return db.session.merge(snapshot, load=False)
+
+def token_auth_required(f):
+    """Decorator to require a session token (Authorization: Bearer <token>)"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        auth_header = request.headers.get('Authorization')
+        
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return jsonify({'error': 'Bearer token required'}), 401
+        
+        user = authenticate_token(auth_header[len('Bearer '):].strip())
+        if not user:
+            return jsonify({'error': 'Invalid or expired token'}), 401
+        
+        return f(user, *args, **kwargs)
+    
+    return decorated_function
 
 def basic_auth_required(f):
-    """Decorator to require Basic Authentication"""
+    """Decorator to require Basic Authentication.
+    
+    A session token from /api/auth/login is accepted in its place, so every
+    protected route works with either mode.
+    """
+    token_protected = token_auth_required(f)
+    
     @wraps(f)
     def decorated_function(*args, **kwargs):
         auth_header = request.headers.get('Authorization')
         
+        if auth_header and auth_header.startswith('Bearer '):
+            return token_protected(*args, **kwargs)
+        
         if not auth_header or not auth_header.startswith('Basic '):
             return jsonify({'error': 'Basic Authentication required'}), 401
         
         try:
-            # Extract and decode credentials
-            encoded_credentials = auth_header.split(' ')[1]
-            decoded_credentials = base64.b64decode(encoded_credentials).decode('utf-8')
-            username, password = decoded_credentials.split(':', 1)
-            
-            # Find user by username or email
-            user = User.query.filter(
-                (User.username == username) | 
-                (User.email == username.lower())
-            ).first()
+            user = authenticate_basic(auth_header)
             
-            if not user or not user.check_password(password):
+            if not user:
                 return jsonify({'error': 'Invalid credentials'}), 401
             
             if not user.is_active:
@@ -39,29 +175,22 @@ def basic_auth_required(f):
     return decorated_function
 
 def get_basic_auth_user():
-    """Extract user from Basic Authentication header"""
+    """Extract user from Basic Authentication header (or a session token)"""
     auth_header = request.headers.get('Authorization')
     
+    if auth_header and auth_header.startswith('Bearer '):
+        return authenticate_token(auth_header[len('Bearer '):].strip())
+    
     if not auth_header or not auth_header.startswith('Basic '):
         return None
     
     try:
-        # Extract and decode credentials
-        encoded_credentials = auth_header.split(' ')[1]
-        decoded_credentials = base64.b64decode(encoded_credentials).decode('utf-8')
-        username, password = decoded_credentials.split(':', 1)
+        user = authenticate_basic(auth_header)
         
-        # Find user by username or email
-        user = User.query.filter(
-            (User.username == username) | 
-            (User.email == username.lower())
-        ).first()
-        
-        if user and user.check_password(password) and user.is_active:
+        if user and user.is_active:
             return user
         
         return None
         
     except Exception:
         return None
-
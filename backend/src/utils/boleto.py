@@ -0,0 +1,223 @@
+import re
+from datetime import date, timedelta
+
+# Parser for Brazilian bill barcodes (44 digits) and typeable lines (linha
+# digitável), following the FEBRABAN layouts:
+#
+#   boleto bancário (47-digit line):
+#     bank(3) currency(1) DV(1) due factor(4) amount(10) free field(25)
+#   arrecadação / convênio (48-digit line, barcode starts with 8):
+#     8 segment(1) value id(1) DV(1) amount(11) company(4) free field(25)
+
+NON_DIGITS = re.compile(r'\D')
+
+# Due date factor: days since 1997-10-07, running 1000..9999 and restarting
+# at 1000 on 2025-02-22, so every factor repeats every 9000 days
+DUE_FACTOR_BASE = date(1997, 10, 7)
+DUE_FACTOR_CYCLE = 9000
+
+# Precomputed lookup tables for the hot loops: the digit sum of 2 * d for
+# modulo 10, and the 2..9 weights (right to left) for modulo 11
+MOD10_DOUBLED = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+MOD11_WEIGHTS = tuple(2 + i % 8 for i in range(48))
+DIGIT_VALUES = {str(digit): digit for digit in range(10)}
+
+BANK_NAMES = {
+    '001': 'Banco do Brasil',
+    '033': 'Santander',
+    '041': 'Banrisul',
+    '070': 'BRB',
+    '077': 'Banco Inter',
+    '104': 'Caixa Econômica Federal',
+    '208': 'BTG Pactual',
+    '212': 'Banco Original',
+    '237': 'Bradesco',
+    '260': 'Nubank',
+    '336': 'C6 Bank',
+    '341': 'Itaú Unibanco',
+    '389': 'Mercantil do Brasil',
+    '422': 'Safra',
+    '633': 'Rendimento',
+    '745': 'Citibank',
+    '748': 'Sicredi',
+    '756': 'Sicoob'
+}
+
+# Arrecadação segment -> (description, bill category used by the app)
+ARRECADACAO_SEGMENTS = {
+    '1': ('Prefeituras', 'Outros'),
+    '2': ('Saneamento', 'Água'),
+    '3': ('Energia elétrica e gás', 'Energia'),
+    '4': ('Telecomunicações', 'Telecomunicações'),
+    '5': ('Órgãos governamentais', 'Outros'),
+    '6': ('Carnês e assemelhados', 'Outros'),
+    '7': ('Multas de trânsito', 'Outros'),
+    '9': ('Uso exclusivo do banco', 'Outros')
+}
+
+# Arrecadação value id -> (modulus of its check digits, amount is in reais)
+ARRECADACAO_VALUE_IDS = {
+    '6': (10, True),
+    '7': (10, False),
+    '8': (11, True),
+    '9': (11, False)
+}
+
+def mod10(digits):
+    """FEBRABAN modulo 10 check digit (weights 2, 1 from the right)"""
+    total = 0
+    double = True
+    for char in reversed(digits):
+        digit = DIGIT_VALUES[char]
+        total += MOD10_DOUBLED[digit] if double else digit
+        double = not double
+    return (10 - total % 10) % 10
+
+def mod11_weighted_sum(digits):
+    return sum(DIGIT_VALUES[char] * weight for char, weight in zip(reversed(digits), MOD11_WEIGHTS))
+
+def boleto_mod11(digits):
+    """Boleto general check digit: 0, 10 and 11 become 1"""
+    check = 11 - mod11_weighted_sum(digits) % 11
+    return 1 if check in (0, 10, 11) else check
+
+def arrecadacao_mod11(digits):
+    """Arrecadação modulo 11: remainders 0 and 1 give 0, remainder 10 gives 1"""
+    remainder = mod11_weighted_sum(digits) % 11
+    if remainder in (0, 1):
+        return 0
+    if remainder == 10:
+        return 1
+    return 11 - remainder
+
+def due_date_from_factor(factor, today=None):
+    """Decode a due date factor, picking the 9000-day cycle closest to today.
+
+    Factor 0 means the bill has no due date.
+    """
+    if factor == 0:
+        return None
+
+    today = today or date.today()
+    due_date = DUE_FACTOR_BASE + timedelta(days=factor)
+    cycles = round((today - due_date).days / DUE_FACTOR_CYCLE)
+    return due_date + timedelta(days=max(cycles, 0) * DUE_FACTOR_CYCLE)
+
+def boleto_line_to_barcode(line):
+    """Rebuild the 44-digit barcode of a 47-digit boleto line, checking the
+    three field check digits
+    """
+    for field, check in ((line[0:9], line[9]), (line[10:20], line[20]), (line[21:31], line[31])):
+        if mod10(field) != DIGIT_VALUES[check]:
+            raise ValueError('Invalid check digit in linha digitável')
+    return line[0:4] + line[32] + line[33:47] + line[4:9] + line[10:20] + line[21:31]
+
+def arrecadacao_line_to_barcode(line):
+    """Rebuild the 44-digit barcode of a 48-digit arrecadação line, checking
+    the check digit of each of its four blocks
+    """
+    modulus, _ = arrecadacao_value_id(line[2])
+    check_digit = mod10 if modulus == 10 else arrecadacao_mod11
+
+    blocks = [line[i:i + 11] for i in range(0, 48, 12)]
+    for i, block in enumerate(blocks):
+        if check_digit(block) != DIGIT_VALUES[line[i * 12 + 11]]:
+            raise ValueError('Invalid check digit in linha digitável')
+    return ''.join(blocks)
+
+def arrecadacao_value_id(char):
+    if char not in ARRECADACAO_VALUE_IDS:
+        raise ValueError('Invalid value identifier in arrecadação code')
+    return ARRECADACAO_VALUE_IDS[char]
+
+def boleto_barcode_to_line(barcode):
+    fields = (barcode[0:4] + barcode[19:24], barcode[24:34], barcode[34:44])
+    return ''.join(field + str(mod10(field)) for field in fields) + barcode[4] + barcode[5:19]
+
+def arrecadacao_barcode_to_line(barcode):
+    modulus, _ = arrecadacao_value_id(barcode[2])
+    check_digit = mod10 if modulus == 10 else arrecadacao_mod11
+    blocks = [barcode[i:i + 11] for i in range(0, 44, 11)]
+    return ''.join(block + str(check_digit(block)) for block in blocks)
+
+def parse_bill_code(code, today=None):
+    """Decode a boleto or arrecadação barcode (44 digits) or linha digitável
+    (47 or 48 digits). Spaces, dots and dashes are ignored.
+
+    Returns a dict with the normalized barcode and line_code, the kind, the
+    amount in cents (None when the code carries no amount) and the due date
+    (None when unknown), plus bank or segment details. Raises ValueError when
+    the code is malformed or a check digit does not match.
+    """
+    digits = NON_DIGITS.sub('', code or '')
+
+    if len(digits) == 44:
+        barcode = digits
+    elif len(digits) == 47:
+        barcode = boleto_line_to_barcode(digits)
+    elif len(digits) == 48 and digits[0] == '8':
+        barcode = arrecadacao_line_to_barcode(digits)
+    else:
+        raise ValueError('Code must be a 44-digit barcode or a 47/48-digit linha digitável')
+
+    if barcode[0] == '8':
+        return parse_arrecadacao_barcode(barcode, today)
+    return parse_boleto_barcode(barcode, today)
+
+def parse_boleto_barcode(barcode, today=None):
+    if boleto_mod11(barcode[:4] + barcode[5:]) != DIGIT_VALUES[barcode[4]]:
+        raise ValueError('Invalid barcode check digit')
+
+    bank_code = barcode[0:3]
+    amount_cents = int(barcode[9:19])
+    return {
+        'kind': 'boleto',
+        'barcode': barcode,
+        'line_code': boleto_barcode_to_line(barcode),
+        'bank_code': bank_code,
+        'bank_name': BANK_NAMES.get(bank_code),
+        'currency_code': barcode[3],
+        'amount_cents': amount_cents or None,
+        'due_date': due_date_from_factor(int(barcode[5:9]), today),
+        'free_field': barcode[19:44]
+    }
+
+def parse_arrecadacao_barcode(barcode, today=None):
+    modulus, is_amount = arrecadacao_value_id(barcode[2])
+    check_digit = mod10 if modulus == 10 else arrecadacao_mod11
+    if check_digit(barcode[:3] + barcode[4:]) != DIGIT_VALUES[barcode[3]]:
+        raise ValueError('Invalid barcode check digit')
+
+    segment = barcode[1]
+    segment_name, category = ARRECADACAO_SEGMENTS.get(segment, ('Desconhecido', 'Outros'))
+    # Segment 6 identifies the company by the first 8 CNPJ digits
+    company_length = 8 if segment == '6' else 4
+    free_field = barcode[15 + company_length:44]
+    amount = int(barcode[4:15])
+
+    return {
+        'kind': 'arrecadacao',
+        'barcode': barcode,
+        'line_code': arrecadacao_barcode_to_line(barcode),
+        'segment': segment,
+        'segment_name': segment_name,
+        'category': category,
+        'company_code': barcode[15:15 + company_length],
+        'amount_cents': amount if is_amount and amount else None,
+        'due_date': arrecadacao_due_date(free_field, today),
+        'free_field': free_field
+    }
+
+def arrecadacao_due_date(free_field, today=None):
+    """Arrecadação layouts have no standard due date, but most utilities start
+    the free field with it as YYYYMMDD. Accept it only when it is a real date
+    within a year or so of today.
+    """
+    today = today or date.today()
+    try:
+        due_date = date(int(free_field[0:4]), int(free_field[4:6]), int(free_field[6:8]))
+    except ValueError:
+        return None
+    if abs((due_date - today).days) > 400:
+        return None
+    return due_date
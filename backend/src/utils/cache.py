@@ -0,0 +1,109 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from flask import request, Response, make_response
+from src.models.user_simple import db, User
+
+SUMMARY_CACHE_SIZE = 1024
+
+class LRUCache:
+    """Small thread-safe LRU mapping with a fixed number of entries.
+    
+    With ttl (seconds), entries also expire that long after being set.
+    """
+    
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def remove_if(self, predicate):
+        """Drop every entry whose value matches predicate"""
+        with self._lock:
+            for key in [key for key, (value, _) in self._data.items() if predicate(value)]:
+                del self._data[key]
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self):
+        return len(self._data)
+
+summary_cache = LRUCache(SUMMARY_CACHE_SIZE)
+
+def bump_data_version(user_id):
+    """Mark the user's financial data as changed.
+    
+    Runs inside the caller's session transaction, so the new version is only
+    visible once the write it describes is committed.
+    """
+    db.session.execute(
+        User.__table__.update()
+        .where(User.id == user_id)
+        .values(data_version=User.data_version + 1)
+    )
+
+def get_data_version(user_id):
+    """Return the current data version for the user"""
+    return db.session.query(User.data_version).filter(User.id == user_id).scalar() or 0
+
+def cached_summary(f):
+    """Cache a summary response per user and data version, with ETag support.
+    
+    Use below basic_auth_required. The cache key includes the query string and
+    today's date, since summaries also depend on what is overdue today.
+    """
+    @wraps(f)
+    def decorated_function(user, *args, **kwargs):
+        version = get_data_version(user.id)
+        key = (
+            f.__name__,
+            user.id,
+            version,
+            date.today().isoformat(),
+            tuple(sorted(request.args.items(multi=True)))
+        )
+        etag = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            body = summary_cache.get(key)
+            if body is None:
+                response = make_response(f(user, *args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                summary_cache.set(key, body)
+            response = Response(body, mimetype='application/json')
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    return decorated_function
@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+from flask import Response, stream_with_context
+
+# Rows fetched per round trip and rows written per HTTP chunk
+EXPORT_YIELD_PER = 1000
+EXPORT_CHUNK_ROWS = 500
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+def stream_export(query, serialize, file_format, filename):
+    """Stream the rows of query as a chunked CSV or NDJSON download.
+    
+    Rows are fetched in batches of EXPORT_YIELD_PER and serialized with
+    serialize (usually the model's to_dict), so memory stays flat no matter
+    how many rows are exported.
+    """
+    rows = (serialize(item) for item in query.yield_per(EXPORT_YIELD_PER))
+    chunks = iter_csv_chunks(rows) if file_format == 'csv' else iter_ndjson_chunks(rows)
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_FORMATS[file_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}.{file_format}'}
+    )
+
+def iter_csv_chunks(rows):
+    """Yield CSV text in chunks of EXPORT_CHUNK_ROWS rows, header first"""
+    buffer = io.StringIO()
+    writer = None
+    
+    for count, row in enumerate(rows, start=1):
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row.keys()), extrasaction='ignore')
+            writer.writeheader()
+        
+        writer.writerow({
+            key: ','.join(str(v) for v in value) if isinstance(value, list) else value
+            for key, value in row.items()
+        })
+        
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def iter_ndjson_chunks(rows):
+    """Yield one JSON document per line in chunks of EXPORT_CHUNK_ROWS rows"""
+    lines = []
+    
+    for row in rows:
+        lines.append(json.dumps(row, ensure_ascii=False))
+        
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    
+    if lines:
+        yield '\n'.join(lines) + '\n'
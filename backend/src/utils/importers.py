@@ -0,0 +1,91 @@
+import csv
+import math
+import re
+from datetime import datetime
+from src.models.transaction import MAX_AMOUNT
+
+# OFX tags look like <TAG>value (SGML) or <TAG>value</TAG> (XML)
+OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)')
+
+def iter_csv_rows(text_stream):
+    """Yield (row_number, row) for each data row of a CSV stream.
+    
+    Rows are read one at a time, so memory does not grow with the file.
+    The delimiter is sniffed from the header to accept ';' separated files
+    exported by Brazilian spreadsheets.
+    """
+    header = text_stream.readline()
+    if not header:
+        return
+    
+    delimiter = ';' if header.count(';') > header.count(',') else ','
+    fieldnames = [name.strip().lower() for name in next(csv.reader([header], delimiter=delimiter))]
+    reader = csv.DictReader(text_stream, fieldnames=fieldnames, delimiter=delimiter)
+    
+    for row_number, row in enumerate(reader, start=2):
+        yield row_number, row
+
+def iter_ofx_rows(text_stream):
+    """Yield (transaction_number, row) for each STMTTRN block of an OFX stream.
+    
+    Works line by line for both SGML (OFX 1.x) and XML (OFX 2.x) files.
+    Rows use the same field names as the CSV import.
+    """
+    current = None
+    transaction_number = 0
+    
+    for line in text_stream:
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if closing:
+                    # A closing tag with no block open carries no transaction
+                    if current is None:
+                        continue
+                    transaction_number += 1
+                    yield transaction_number, ofx_to_row(current)
+                    current = None
+                else:
+                    current = {}
+            elif current is not None and not closing and value.strip():
+                current[tag] = value.strip()
+
+def ofx_to_row(ofx):
+    """Map an OFX STMTTRN block to the CSV import field names"""
+    amount = ofx.get('TRNAMT', '')
+    is_expense = amount.startswith('-') or ofx.get('TRNTYPE', '').upper() == 'DEBIT'
+    
+    return {
+        'type': 'expense' if is_expense else 'income',
+        'amount': amount.lstrip('-+'),
+        'description': ofx.get('MEMO') or ofx.get('NAME'),
+        'date': ofx.get('DTPOSTED', ''),
+        'notes': ofx.get('FITID')
+    }
+
+def parse_amount(value):
+    """Parse an amount in either 1234.56 or Brazilian 1.234,56 notation"""
+    value = str(value).strip().replace('R$', '').replace(' ', '')
+    if ',' in value:
+        value = value.replace('.', '').replace(',', '.')
+    
+    # float() also accepts inf, nan and huge exponents, none of which fit in
+    # the INTEGER cents columns
+    amount = float(value)
+    if not math.isfinite(amount) or abs(amount) >= MAX_AMOUNT:
+        raise ValueError(f'Invalid amount: {value}')
+    return amount
+
+def parse_date(value):
+    """Parse ISO, dd/mm/yyyy or OFX (YYYYMMDD[HHMMSS]) dates"""
+    value = str(value).strip()
+    
+    # OFX dates may carry a timezone suffix such as [-3:BRT]
+    ofx_date = value.split('[')[0].split('.')[0]
+    if ofx_date.isdigit() and len(ofx_date) in (8, 14):
+        return datetime.strptime(ofx_date, '%Y%m%d%H%M%S' if len(ofx_date) == 14 else '%Y%m%d')
+    
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return datetime.strptime(value, '%d/%m/%Y')
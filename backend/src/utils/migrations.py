@@ -0,0 +1,233 @@
+from sqlalchemy import inspect, Integer
+from src.models.user_simple import db
+from src.utils.search import create_search_index
+
+# Rows per transaction in the data backfills
+BACKFILL_BATCH_SIZE = 1000
+
+def migrate_transaction_money_to_cents():
+    """Convert Transaction money columns from FLOAT reais to INTEGER cents.
+    
+    SQLite cannot change a column type, and a FLOAT column would keep storing
+    cents as REAL, so the table is rebuilt and its rows copied over with the
+    amounts rounded to cents. The daily rollup only holds derived data and is
+    recreated from the converted rows.
+    """
+    from src.models.transaction import Transaction, TransactionDailyRollup
+    
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    migrated = False
+    
+    if 'transactions' in existing_tables:
+        columns = {column['name']: column['type'] for column in inspector.get_columns('transactions')}
+        
+        if not isinstance(columns.get('amount'), Integer):
+            money_columns = ('amount', 'card_fee', 'net_amount')
+            copied = [column.name for column in Transaction.__table__.columns if column.name in columns]
+            select_list = ', '.join(
+                f'CAST(ROUND({name} * 100) AS INTEGER)' if name in money_columns else name
+                for name in copied
+            )
+            
+            with db.engine.begin() as connection:
+                for index in inspector.get_indexes('transactions'):
+                    connection.exec_driver_sql(f'DROP INDEX {index["name"]}')
+                connection.exec_driver_sql('ALTER TABLE transactions RENAME TO transactions_float')
+                Transaction.__table__.create(connection)
+                connection.exec_driver_sql(
+                    f'INSERT INTO transactions ({", ".join(copied)}) '
+                    f'SELECT {select_list} FROM transactions_float'
+                )
+                connection.exec_driver_sql('DROP TABLE transactions_float')
+            migrated = True
+    
+    if 'transaction_daily_rollups' in existing_tables:
+        rollup_columns = {column['name'] for column in inspector.get_columns('transaction_daily_rollups')}
+        
+        if 'amount_cents' not in rollup_columns or migrated:
+            TransactionDailyRollup.__table__.drop(db.engine)
+            TransactionDailyRollup.__table__.create(db.engine)
+            TransactionDailyRollup.rebuild()
+            db.session.commit()
+    
+    return migrated
+
+def add_missing_columns():
+    """Add columns declared on the models that existing tables do not have yet.
+    
+    SQLite only supports ADD COLUMN, so new columns must be nullable or carry
+    a server_default.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    dialect = db.engine.dialect
+    ddl_compiler = dialect.ddl_compiler(dialect, None)
+    added = []
+    
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            
+            column_type = column.type.compile(dialect=dialect)
+            ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+            if column.server_default is not None:
+                ddl += f' DEFAULT {ddl_compiler.get_column_default_string(column)}'
+                if not column.nullable:
+                    ddl += ' NOT NULL'
+            
+            with db.engine.begin() as connection:
+                connection.exec_driver_sql(ddl)
+            added.append(f'{table.name}.{column.name}')
+    
+    return added
+
+def create_missing_indexes():
+    """Create indexes declared on the models that the database does not have yet.
+
+    db.create_all() only creates missing tables, so indexes added to a model
+    after its table already exists in app.db are never built by it.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(bind=db.engine)
+                created.append(index.name)
+    
+    return created
+
+def backfill_transaction_rollups():
+    """Fill the daily rollup for databases created before it existed"""
+    from src.models.transaction import Transaction, TransactionDailyRollup
+    
+    if TransactionDailyRollup.query.first() is None and Transaction.query.first() is not None:
+        TransactionDailyRollup.rebuild()
+        db.session.commit()
+
+def backfill_customer_keys(batch_size=BACKFILL_BATCH_SIZE):
+    """Fill Customer.name_key for customers created before it existed.
+    
+    Customers whose names normalize to a key another customer of the same
+    user already has are merged into that one: its blank contact fields are
+    filled in and the duplicate's receivables move over. Commits per batch.
+    """
+    from src.models.receivable import Receivable, Customer, normalize_customer_name
+    
+    merged = 0
+    while True:
+        batch = Customer.query.filter(Customer.name_key.is_(None)).order_by(Customer.id).limit(batch_size).all()
+        if not batch:
+            break
+        
+        for customer in batch:
+            name_key = normalize_customer_name(customer.name)
+            keeper = Customer.query.filter_by(user_id=customer.user_id, name_key=name_key).first()
+            if keeper is None:
+                customer.name_key = name_key
+                continue
+            
+            for field in ('phone', 'email', 'address', 'document', 'notes', 'tags'):
+                if not getattr(keeper, field) and getattr(customer, field):
+                    setattr(keeper, field, getattr(customer, field))
+            db.session.execute(
+                Receivable.__table__.update()
+                .where(Receivable.customer_id == customer.id)
+                .values(customer_id=keeper.id)
+            )
+            db.session.delete(customer)
+            merged += 1
+        
+        db.session.commit()
+    
+    return merged
+
+def backfill_receivable_customers(batch_size=BACKFILL_BATCH_SIZE):
+    """Link receivables created before Receivable.customer_id existed to
+    their customer, matched by normalized name and created when missing.
+    
+    Walks the unlinked receivables in id order, one batch per transaction,
+    with one customer lookup and one executemany UPDATE per batch. Customer
+    stats are rebuilt at the end when anything was linked.
+    """
+    from src.models.receivable import Receivable, Customer, normalize_customer_name
+    
+    link = (
+        Receivable.__table__.update()
+        .where(Receivable.id == db.bindparam('receivable_id'))
+        .values(customer_id=db.bindparam('linked_customer_id'))
+    )
+    linked = 0
+    last_id = 0
+    
+    while True:
+        rows = db.session.query(Receivable.id, Receivable.user_id, Receivable.customer_name).filter(
+            Receivable.customer_id.is_(None),
+            Receivable.id > last_id
+        ).order_by(Receivable.id).limit(batch_size).all()
+        if not rows:
+            break
+        
+        names = {}
+        for _, user_id, customer_name in rows:
+            names.setdefault((user_id, normalize_customer_name(customer_name)), customer_name)
+        
+        customer_ids = {
+            (user_id, name_key): customer_id
+            for customer_id, user_id, name_key in db.session.query(
+                Customer.id, Customer.user_id, Customer.name_key
+            ).filter(
+                Customer.user_id.in_({user_id for user_id, _ in names}),
+                Customer.name_key.in_({name_key for _, name_key in names})
+            )
+        }
+        
+        missing = [
+            Customer(user_id=user_id, name=customer_name, name_key=name_key)
+            for (user_id, name_key), customer_name in names.items()
+            if (user_id, name_key) not in customer_ids
+        ]
+        if missing:
+            db.session.add_all(missing)
+            db.session.flush()
+            customer_ids.update({(customer.user_id, customer.name_key): customer.id for customer in missing})
+        
+        db.session.execute(link, [
+            {
+                'receivable_id': receivable_id,
+                'linked_customer_id': customer_ids[(user_id, normalize_customer_name(customer_name))]
+            }
+            for receivable_id, user_id, customer_name in rows
+        ])
+        db.session.commit()
+        
+        linked += len(rows)
+        last_id = rows[-1].id
+    
+    if linked:
+        Customer.rebuild_stats()
+        db.session.commit()
+    
+    return linked
+
+def run_migrations():
+    """Bring an existing database up to date with the current models"""
+    migrate_transaction_money_to_cents()
+    add_missing_columns()
+    create_missing_indexes()
+    backfill_transaction_rollups()
+    backfill_customer_keys()
+    backfill_receivable_customers()
+    create_search_index()
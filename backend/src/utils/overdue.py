@@ -0,0 +1,74 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, select
+from src.models.user_simple import db, User
+from src.models.bill import Bill, BillTemplate
+from src.models.receivable import Receivable
+
+# The daily sweep runs this long after midnight
+OVERDUE_SWEEP_DELAY = timedelta(minutes=5)
+
+# (name, model, statuses that become overdue once past due). Receivables
+# with payments keep their 'partial' status, as in
+# Receivable.update_remaining_amount().
+OVERDUE_SWEEPS = (
+    ('bills', Bill, ('pending',)),
+    ('receivables', Receivable, ('pending',))
+)
+
+def sweep_overdue(today=None):
+    """Move past-due bills and receivables to status 'overdue'.
+    
+    One set-based UPDATE per table. The data version of every affected user
+    is bumped in the same transaction so cached summaries are recomputed.
+    Returns the number of rows moved per table.
+    """
+    today = today or date.today()
+    counts = {}
+    
+    for name, model, statuses in OVERDUE_SWEEPS:
+        past_due = and_(model.status.in_(statuses), model.due_date < today)
+        
+        db.session.execute(
+            User.__table__.update()
+            .where(User.id.in_(select(model.user_id).where(past_due).distinct()))
+            .values(data_version=User.data_version + 1)
+        )
+        result = db.session.execute(
+            model.__table__.update().where(past_due).values(status='overdue')
+        )
+        counts[name] = result.rowcount
+    
+    db.session.commit()
+    return counts
+
+def seconds_until_next_sweep(now=None):
+    now = now or datetime.now()
+    next_run = datetime.combine(now.date() + timedelta(days=1), datetime.min.time()) + OVERDUE_SWEEP_DELAY
+    return (next_run - now).total_seconds()
+
+def start_overdue_sweeper(app):
+    """Sweep now and then every day shortly after midnight, in a daemon thread.
+    
+    Each run first materializes recurring bills that entered the horizon.
+    For servers that do not run main.py directly, schedule
+    `flask bills materialize-recurring` and `flask bills sweep-overdue`
+    instead. Running both is harmless.
+    """
+    def run():
+        while True:
+            with app.app_context():
+                try:
+                    BillTemplate.materialize()
+                    db.session.commit()
+                    counts = sweep_overdue()
+                    app.logger.info('Overdue sweep: %s', counts)
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception('Overdue sweep failed')
+            time.sleep(seconds_until_next_sweep())
+    
+    thread = threading.Thread(target=run, name='overdue-sweeper', daemon=True)
+    thread.start()
+    return thread
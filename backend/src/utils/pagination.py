@@ -0,0 +1,20 @@
+import base64
+import json
+
+def encode_cursor(*values):
+    """Encode the sort key of the last row of a page into an opaque cursor"""
+    raw = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raising ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    
+    return values
@@ -0,0 +1,146 @@
+import re
+from src.models.user_simple import db
+
+SEARCH_TABLE = 'search_index'
+
+# Indexed sources: kind -> (table, code, indexed columns, title expression,
+# body expression)
+SEARCH_SOURCES = {
+    'transaction': (
+        'transactions', 1, ('description', 'notes'),
+        "{row}.description",
+        "coalesce({row}.notes, '')"
+    ),
+    'bill': (
+        'bills', 2, ('title', 'company', 'notes'),
+        "{row}.title",
+        "coalesce({row}.company, '') || ' ' || coalesce({row}.notes, '')"
+    ),
+    'receivable': (
+        'receivables', 3, ('customer_name', 'description', 'reference_number'),
+        "{row}.customer_name",
+        "{row}.description || ' ' || coalesce({row}.reference_number, '')"
+    )
+}
+
+# Index rowids are (user_id << 40) | (id << 2) | code: the triggers can find a
+# row without a secondary index, and one user's rows form a contiguous rowid
+# range, which FTS5 can seek to instead of walking every user's matches.
+SEARCH_USER_SHIFT = 40
+SEARCH_KIND_BITS = 2
+
+# A word, optionally followed by * to match it as a prefix
+SEARCH_TERM = re.compile(r'(\w+)(\*?)', re.UNICODE)
+
+def search_rowid(kind, row='NEW'):
+    code = SEARCH_SOURCES[kind][1]
+    return f'(({row}.user_id << {SEARCH_USER_SHIFT}) | ({row}.id << {SEARCH_KIND_BITS}) | {code})'
+
+def search_insert_sql(kind, row='NEW'):
+    """INSERT of one source row (NEW in a trigger, or the table for a backfill)"""
+    _, _, _, title, body = SEARCH_SOURCES[kind]
+    return (
+        f'INSERT INTO {SEARCH_TABLE} (rowid, kind, ref_id, title, body) '
+        f"SELECT {search_rowid(kind, row)}, '{kind}', {row}.id, "
+        f'{title.format(row=row)}, {body.format(row=row)}'
+    )
+
+def create_search_index():
+    """Create the FTS5 search index and the triggers that keep it in sync.
+    
+    The triggers live in SQLite, so every write path (ORM, bulk import, batch
+    endpoint) updates the index; updates only reindex when an indexed column
+    changes. Safe to run on every start; the index is filled from existing
+    rows only when it is first created.
+    """
+    with db.engine.begin() as connection:
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)
+        ).first() is not None
+        
+        if not exists:
+            connection.exec_driver_sql(
+                f'CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5('
+                'kind UNINDEXED, ref_id UNINDEXED, title, body, '
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        
+        for kind, (table, _, columns, _, _) in SEARCH_SOURCES.items():
+            delete = f'DELETE FROM {SEARCH_TABLE} WHERE rowid = {search_rowid(kind, "OLD")};'
+            insert = f'{search_insert_sql(kind, "NEW")};'
+            connection.exec_driver_sql(
+                f'CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} '
+                f'BEGIN {insert} END'
+            )
+            connection.exec_driver_sql(
+                f'CREATE TRIGGER IF NOT EXISTS {table}_search_update '
+                f'AFTER UPDATE OF {", ".join(columns)} ON {table} '
+                f'BEGIN {delete} {insert} END'
+            )
+            connection.exec_driver_sql(
+                f'CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} '
+                f'BEGIN {delete} END'
+            )
+            
+            if not exists:
+                connection.exec_driver_sql(f'{search_insert_sql(kind, table)} FROM {table}')
+    
+    return not exists
+
+def build_match_query(text, columns):
+    """Turn free text into an FTS5 query over columns.
+    
+    Every word becomes a quoted term, so user input cannot inject FTS5 syntax,
+    and all of them must match. Words are matched whole (case and accents are
+    folded by the tokenizer) unless followed by *. Prefix terms make FTS5 merge
+    every matching term across all users, so they are opt-in. Returns None
+    when the text has no searchable words.
+    """
+    terms = [f'"{word}"{star}' for word, star in SEARCH_TERM.findall(text)]
+    if not terms:
+        return None
+    return f'{{{" ".join(columns)}}} : ({" AND ".join(terms)})'
+
+def search(user_id, text, kinds=None, limit=20):
+    """Return (kind, ref_id, title, snippet) hits for user_id, with the matched
+    words marked in the title and in a short excerpt of the body.
+    
+    Hits in the title rank before hits only in the body, newest first within
+    each group. bm25() is avoided on purpose: it computes its IDF by scanning
+    each term's matches across the whole index, which grows with every user's
+    data, while a rowid ordered scan of the user's range stops after limit hits.
+    """
+    user_range = {
+        'low': user_id << SEARCH_USER_SHIFT,
+        'high': ((user_id + 1) << SEARCH_USER_SHIFT) - 1
+    }
+    kind_filter = ''
+    if kinds:
+        kind_filter = ' AND kind IN ({})'.format(', '.join(f':kind_{i}' for i in range(len(kinds))))
+        user_range.update({f'kind_{i}': kind for i, kind in enumerate(kinds)})
+    
+    sql = db.text(
+        f"SELECT rowid, kind, ref_id, highlight({SEARCH_TABLE}, 2, '[', ']'), "
+        f"snippet({SEARCH_TABLE}, 3, '[', ']', '...', 12) "
+        f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match '
+        f'AND rowid BETWEEN :low AND :high{kind_filter} '
+        'ORDER BY rowid DESC LIMIT :limit'
+    )
+    
+    hits = []
+    seen = set()
+    for columns in (('title',), ('title', 'body')):
+        match = build_match_query(text, columns)
+        if match is None:
+            break
+        
+        rows = db.session.execute(sql, dict(user_range, match=match, limit=limit + len(hits))).all()
+        for rowid, kind, ref_id, title, snippet in rows:
+            if rowid not in seen and len(hits) < limit:
+                seen.add(rowid)
+                hits.append((kind, ref_id, title, snippet))
+        
+        if len(hits) >= limit:
+            break
+    
+    return hits
@@ -0,0 +1,46 @@
+import os
+import sys
+import base64
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from src.models.user_simple import db, User
+from src.routes.auth import auth_bp
+from src.routes.transactions import transactions_bp
+from src.routes.bills import bills_bp
+from src.routes.receivables import receivables_bp
+
+USERNAME = 'tester'
+PASSWORD = 'Tester12345'
+
+@pytest.fixture
+def app(tmp_path):
+    """The API on a throwaway SQLite file with one user"""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test'
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(transactions_bp, url_prefix='/api')
+    app.register_blueprint(bills_bp, url_prefix='/api')
+    app.register_blueprint(receivables_bp, url_prefix='/api')
+    db.init_app(app)
+    
+    with app.app_context():
+        db.create_all()
+        user = User(username=USERNAME, email=f'{USERNAME}@example.com')
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+    
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers():
+    credentials = base64.b64encode(f'{USERNAME}:{PASSWORD}'.encode('utf-8')).decode('utf-8')
+    return {'Authorization': f'Basic {credentials}'}
@@ -0,0 +1,25 @@
+import io
+from src.utils.importers import iter_ofx_rows
+
+def test_ofx_stray_closing_tag_is_skipped():
+    ofx = io.StringIO(
+        '<BANKTRANLIST>\n'
+        '</STMTTRN>\n'
+        '<STMTTRN>\n'
+        '<TRNTYPE>DEBIT\n'
+        '<DTPOSTED>20260110\n'
+        '<TRNAMT>-50.00\n'
+        '<MEMO>Conta luz\n'
+        '</STMTTRN>\n'
+        '</STMTTRN>\n'
+        '</BANKTRANLIST>\n'
+    )
+    
+    rows = list(iter_ofx_rows(ofx))
+    
+    assert len(rows) == 1
+    transaction_number, row = rows[0]
+    assert transaction_number == 1
+    assert row['type'] == 'expense'
+    assert row['amount'] == '50.00'
+    assert row['description'] == 'Conta luz'
@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+from src.models.user_simple import db, User
+from src.models.receivable import Receivable
+
+def add_receivables(app, statuses):
+    with app.app_context():
+        user = User.query.first()
+        for index, status in enumerate(statuses):
+            paid = {'paid': 100, 'partial': 40}.get(status, 0)
+            db.session.add(Receivable(
+                user_id=user.id,
+                customer_name=f'Customer {index}',
+                type='invoice',
+                description='Test',
+                original_amount=100,
+                paid_amount=paid,
+                remaining_amount=100 - paid,
+                due_date=date.today() + timedelta(days=index - 2),
+                status=status
+            ))
+        db.session.commit()
+
+def test_summary_counts_each_receivable_in_one_status_bucket(app, client, auth_headers):
+    add_receivables(app, ['pending', 'pending', 'overdue', 'partial', 'paid'])
+    
+    response = client.get('/api/api/receivables/summary', headers=auth_headers)
+    
+    assert response.status_code == 200
+    summary = response.get_json()['summary']
+    assert summary['total_receivables'] == 5
+    assert summary['pending_receivables'] == 3
+    assert summary['partial_receivables'] == 1
+    assert summary['paid_receivables'] == 1
+    assert (summary['pending_receivables'] + summary['partial_receivables']
+            + summary['paid_receivables']) == summary['total_receivables']
@@ -0,0 +1,16 @@
+import pytest
+
+@pytest.mark.parametrize('amount', ['NaN', 'Infinity', '-inf', '1e30'])
+def test_non_finite_or_huge_amounts_are_rejected(client, auth_headers, amount):
+    data = {'type': 'expense', 'amount': 10, 'description': 'Test', 'category': 'Food'}
+    response = client.post('/api/transactions', json=data, headers=auth_headers)
+    transaction_id = response.get_json()['transaction']['id']
+    
+    response = client.post('/api/transactions', json=dict(data, amount=amount), headers=auth_headers)
+    assert response.status_code == 400
+    
+    response = client.put(f'/api/transactions/{transaction_id}', json={'amount': amount}, headers=auth_headers)
+    assert response.status_code == 400
+    
+    response = client.get(f'/api/transactions/{transaction_id}', headers=auth_headers)
+    assert response.get_json()['transaction']['amount'] == 10
@@ -0,0 +1,27 @@
+def create_data(**overrides):
+    data = {'type': 'expense', 'amount': 10, 'description': 'Test', 'category': 'Food'}
+    data.update(overrides)
+    return data
+
+def test_batch_reports_malformed_operations_per_operation(client, auth_headers):
+    response = client.post('/api/transactions', json=create_data(), headers=auth_headers)
+    transaction_id = response.get_json()['transaction']['id']
+    
+    response = client.post('/api/transactions/batch', json={'operations': [
+        {'op': 'create', 'data': create_data(amount=None)},
+        {'op': 'create', 'data': ['not', 'an', 'object']},
+        {'op': 'update', 'id': [transaction_id], 'data': {'amount': 5}},
+        {'op': 'update', 'id': transaction_id, 'data': {'amount': None}},
+        'not an operation',
+        {'op': 'create', 'data': create_data(amount=20)},
+        {'op': 'update', 'id': transaction_id, 'data': {'amount': 15}}
+    ]}, headers=auth_headers)
+    
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [result['status'] for result in body['results']] == [400, 400, 400, 400, 400, 201, 200]
+    assert body['succeeded'] == 2
+    assert body['failed'] == 5
+    
+    transactions = client.get('/api/transactions', headers=auth_headers).get_json()['transactions']
+    assert sorted(transaction['amount'] for transaction in transactions) == [15, 20]